@@ -1,163 +1,95 @@
+import gzip
+import hashlib
+import heapq
+import bisect
+import csv
+import hmac
+import io
+import ipaddress
+import json
+import math
+import multiprocessing
 import os
+import queue
+import random
+import re
+import socket
+import sqlite3
+import struct
+import sys
 import threading
 import time
-from flask import Flask, jsonify, request, render_template_string, send_from_directory
+import uuid
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from flask import Flask, jsonify, request, render_template_string, send_from_directory, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-# ... rest of your imports ...
+
+# requests and BeautifulSoup are imported lazily (see CricketScraper) so that
+# a cold worker can bind and answer health checks before paying for them.
 
 app = Flask(__name__)
 
-# Enhanced CORS configuration for both development and production
-cors_config = {
-    "origins": [
-        "http://localhost:*",
-        "http://127.0.0.1:*",
-        "https://*.pages.dev",  # For Cloudflare Pages
-        "https://*.netlify.app",  # If using Netlify
-        "https://*.vercel.app",   # If using Vercel
-        "https://*.onrender.com", # For Render deployments
-        "file://",  # For local file access
-        # Add your specific production URLs here
-        "https://gajju-trial1.pages.dev/",  # Replace with your actual URL
-    ],
-    "methods": ["GET", "POST", "OPTIONS"],
-    "allow_headers": [
-        "Content-Type",
-        "Authorization",
-        "Access-Control-Allow-Credentials",
-        "Access-Control-Allow-Origin",
-        "Accept"
-    ],
-    "supports_credentials": True,
-    "max_age": 3600
-}
+# Per-request stage timings, reported in the Server-Timing header
+TIMING_ENABLED = os.environ.get('SERVER_TIMING', '1') == '1'
+REQUEST_TIMINGS = threading.local()
 
-# Apply CORS with specific configuration
-CORS(app, resources={
-    r"/api/*": cors_config,
-    r"/": cors_config,
-    r"/live": cors_config,
-    r"/test.html": cors_config
-})
+@contextmanager
+def timed(stage):
+    """Add the time spent in the block to the current request's stage totals"""
+    stages = getattr(REQUEST_TIMINGS, 'stages', None)
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - started
 
-# Add after_request handler for additional CORS headers
-@app.after_request
-def after_request(response):
-    origin = request.headers.get('Origin')
-    
-    # List of allowed origins
-    allowed_origins = [
-        'http://localhost:3000',
-        'http://localhost:5000',
-        'http://localhost:8080',
-        'http://127.0.0.1:5000',
-        'https://your-site.pages.dev',  # Replace with your actual frontend URL
-        # Add more production URLs as needed
-    ]
-    
-    # If origin is in allowed list or in development
-    if origin in allowed_origins or (app.debug and origin and origin.startswith('http://localhost')):
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Accept'
-    
-    # For preflight requests
-    if request.method == 'OPTIONS':
-        response.headers['Access-Control-Max-Age'] = '3600'
-        response.status_code = 200
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with encoding counted as the 'json' stage"""
     
-    return response
-
-# Add specific OPTIONS handlers for preflight requests
-@app.route('/api/current-score', methods=['OPTIONS'])
-@app.route('/api/scrape', methods=['OPTIONS'])
-@app.route('/api/status', methods=['OPTIONS'])
-@app.route('/api/set-url', methods=['OPTIONS'])
-@app.route('/api/debug', methods=['OPTIONS'])
-@app.route('/api/toggle-auto-update', methods=['OPTIONS'])
-def handle_preflight():
-    return jsonify({'status': 'ok'}), 200
+    def dumps(self, obj, **kwargs):
+        with timed('json'):
+            return super().dumps(obj, **kwargs)
 
-# ... rest of your existing code remains the same ...
-
-# Global variables
-CURRENT_MATCH_URL = None
-MATCH_DATA = {}
-AUTO_UPDATE = True
-UPDATE_INTERVAL = 30
-
-# ... all your existing classes and routes ...
-
-# At the very bottom, modify the if __name__ == '__main__': block
-if __name__ == '__main__':
-    # Check if running on Render or other production environment
-    is_production = os.environ.get('RENDER') == 'true' or os.environ.get('PRODUCTION') == 'true'
+class ServerTimingMiddleware:
+    """WSGI wrapper adding Server-Timing: fetch, soup, parse_title, json, cors, total"""
     
-    if not is_production:
-        # For local development
-        try:
-            # Start background update thread
-            update_thread = threading.Thread(target=auto_update_scores, daemon=True)
-            update_thread.start()
-            
-            # Get user input for local development
-            get_user_input()
-            
-            # Run Flask app with development settings
-            app.run(
-                debug=False, 
-                host='0.0.0.0', 
-                port=5000, 
-                use_reloader=False  # Disable reloader to prevent double thread starts
-            )
-            
-        except KeyboardInterrupt:
-            print(f"\n\n{Colors.CYAN}Server stopped. Goodbye! 👋{Colors.ENDC}")
-            sys.exit(0)
-    else:
-        # For production on Render or other platforms
-        print(f"{Colors.GREEN}Starting in production mode...{Colors.ENDC}")
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        if not TIMING_ENABLED:
+            return self.wsgi_app(environ, start_response)
         
-        # Start background update thread
-        update_thread = threading.Thread(target=auto_update_scores, daemon=True)
-        update_thread.start()
+        stages = REQUEST_TIMINGS.stages = {}
+        started = time.perf_counter()
         
-        # Set default URL from environment variable if available
-        default_url = os.environ.get('DEFAULT_MATCH_URL', '')
-        if default_url and not CURRENT_MATCH_URL:
-            CURRENT_MATCH_URL = default_url
-            print(f"{Colors.CYAN}Using default match URL from environment{Colors.ENDC}")
-            
-            # Do initial scrape
-            data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
-            if data:
-                MATCH_DATA = data
-                print(f"{Colors.GREEN}Initial data loaded successfully{Colors.ENDC}")
-        
-        # Get port from environment
-        port = int(os.environ.get('PORT', 5000))
+        def timed_start_response(status, headers, exc_info=None):
+            total = time.perf_counter() - started
+            metrics = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in stages.items()]
+            metrics.append(f"total;dur={total * 1000:.2f}")
+            headers.append(('Server-Timing', ', '.join(metrics)))
+            headers.append(('Timing-Allow-Origin', '*'))
+            return start_response(status, headers, exc_info)
         
-        # Run app without reloader in production
-        # Note: In production, the platform (Render) handles process management
-        app.run(
-            host='0.0.0.0', 
-            port=port,
-            debug=False,
-            use_reloader=False  # Never use reloader in production
-        )
-        from flask import Flask, jsonify, request, render_template_string, send_from_directory
-from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
-import re
-import threading
-import time
-from datetime import datetime
-import os
-import sys
+        try:
+            return self.wsgi_app(environ, timed_start_response)
+        finally:
+            REQUEST_TIMINGS.stages = None
+
+app.json = TimedJSONProvider(app)
+app.wsgi_app = ServerTimingMiddleware(app.wsgi_app)
 
-app = Flask(__name__)
 # Enhanced CORS configuration
 cors_config = {
     "origins": [
@@ -169,7 +101,7 @@ cors_config = {
         "https://*.netlify.app",
         "file://",
     ],
-    "methods": ["GET", "POST", "OPTIONS"],
+    "methods": ["GET", "POST", "DELETE", "OPTIONS"],
     "allow_headers": [
         "Content-Type",
         "Authorization",
@@ -188,49 +120,116 @@ CORS(app, resources={
     r"/live": cors_config,
     r"/test.html": cors_config
 })
+# Origins that also get explicit method/header lists (see after_request)
+ALLOWED_ORIGINS = [
+    'http://localhost:3000',
+    'http://localhost:5000',
+    'http://localhost:8080',
+    'http://127.0.0.1:5000',
+    'https://live-cricket-k3it.onrender.com',
+]
+
+@lru_cache(maxsize=256)
+def cors_headers(origin):
+    """CORS headers an /api/* GET from origin gets (flask-cors + after_request)
+    
+    For responses served outside Flask, e.g. by the ASGI entry point. The
+    result is cached per origin; copy it before changing it.
+    """
+    from flask_cors.core import get_cors_headers, get_cors_options
+    
+    headers = dict(get_cors_headers(get_cors_options(app, cors_config), {'Origin': origin}, 'GET'))
+    if origin in ALLOWED_ORIGINS or (app.debug and origin and origin.startswith('http://localhost')):
+        headers.update({
+            'Access-Control-Allow-Origin': origin,
+            'Access-Control-Allow-Credentials': 'true',
+            'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization, Accept',
+        })
+    return headers
+
 # Add after_request handler for additional CORS headers
 @app.after_request
 def after_request(response):
-    origin = request.headers.get('Origin')
-    
-    # List of allowed origins
-    allowed_origins = [
-        'http://localhost:3000',
-        'http://localhost:5000',
-        'http://localhost:8080',
-        'http://127.0.0.1:5000',
-        'https://live-cricket-k3it.onrender.com',
-    ]
-    
-    # If origin is in allowed list or in development
-    if origin in allowed_origins or (app.debug and origin and origin.startswith('http://localhost')):
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Accept'
-    
-    # For preflight requests
-    if request.method == 'OPTIONS':
-        response.headers['Access-Control-Max-Age'] = '3600'
-        response.status_code = 200
+    with timed('cors'):
+        origin = request.headers.get('Origin')
+        
+        # If origin is in allowed list or in development
+        if origin in ALLOWED_ORIGINS or (app.debug and origin and origin.startswith('http://localhost')):
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Accept'
+        
+        # For preflight requests
+        if request.method == 'OPTIONS':
+            response.headers['Access-Control-Max-Age'] = '3600'
+            response.status_code = 200
     
     return response
 
 # Add specific OPTIONS handlers for preflight requests
 @app.route('/api/current-score', methods=['OPTIONS'])
+@app.route('/api/scores', methods=['OPTIONS'])
+@app.route('/api/events/<match_id>', methods=['OPTIONS'])
+@app.route('/api/export/<fmt>', methods=['OPTIONS'])
+@app.route('/api/search', methods=['OPTIONS'])
+@app.route('/api/players/<path:name>', methods=['OPTIONS'])
+@app.route('/api/webhooks', methods=['OPTIONS'])
+@app.route('/api/webhooks/<sub_id>', methods=['OPTIONS'])
 @app.route('/api/scrape', methods=['OPTIONS'])
 @app.route('/api/status', methods=['OPTIONS'])
 @app.route('/api/set-url', methods=['OPTIONS'])
 @app.route('/api/debug', methods=['OPTIONS'])
 @app.route('/api/toggle-auto-update', methods=['OPTIONS'])
-def handle_preflight():
+@app.route('/healthz', methods=['OPTIONS'])
+@app.route('/readyz', methods=['OPTIONS'])
+@app.route('/api/admin/profile', methods=['OPTIONS'])
+@app.route('/api/admin/timing', methods=['OPTIONS'])
+def handle_preflight(**kwargs):
     return jsonify({'status': 'ok'}), 200
 
 # Global variables
 CURRENT_MATCH_URL = None
-MATCH_DATA = {}
 AUTO_UPDATE = True
-UPDATE_INTERVAL = 30  # seconds
+UPDATE_INTERVAL = int(os.environ.get('UPDATE_INTERVAL', 30))  # seconds
+TRACKED_MATCHES = {}  # match_id -> url
+MATCH_SOURCES = {}  # match_id -> extra equivalent URLs (mirrors)
+SNAPSHOTS = {}  # match_id -> latest Snapshot
+PUBLISH_LOCK = threading.Lock()  # serializes writers only; readers never lock
+MATCH_PATCHES = {}  # match_id -> deque of (version, JSON-Patch ops)
+PATCH_HISTORY = 50  # versions a client may lag behind and still get a delta
+MATCH_EVENTS = {}  # match_id -> EventDetector
+MATCH_WAITERS = {}  # match_id -> threading.Event set on the next version bump
+PUBLISH_LISTENERS = []  # callables(match_id, snapshot) run after each version bump
+LONG_POLL_MAX = float(os.environ.get('LONG_POLL_MAX', 25))  # stay under gunicorn's 30s timeout
+LONG_POLL_SLOTS = threading.BoundedSemaphore(int(os.environ.get('LONG_POLL_SLOTS', 8)))  # parked requests per worker, well under --threads
+POLL_WORKERS = int(os.environ.get('POLL_WORKERS', 4))
+
+# Match registry bounds (see MatchRegistry)
+MAX_MATCHES = int(os.environ.get('MAX_MATCHES', 50))
+MAX_MATCH_BYTES = int(os.environ.get('MAX_MATCH_BYTES', 32 * 1024 * 1024))
+MATCH_IDLE_SECONDS = float(os.environ.get('MATCH_IDLE_SECONDS', 2 * 60 * 60))
+
+# Admission control for on-demand scrapes (/api/scrape, /api/set-url)
+SCRAPE_CLIENT_RATE = float(os.environ.get('SCRAPE_CLIENT_RATE', 0.1))  # tokens/second per client IP
+SCRAPE_CLIENT_BURST = int(os.environ.get('SCRAPE_CLIENT_BURST', 5))
+SCRAPE_URL_RATE = float(os.environ.get('SCRAPE_URL_RATE', 0.2))  # tokens/second per target URL
+SCRAPE_URL_BURST = int(os.environ.get('SCRAPE_URL_BURST', 2))
+SCRAPE_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', 2))
+SCRAPE_QUEUE = int(os.environ.get('SCRAPE_QUEUE', 8))
+SCRAPE_CACHE_TTL = float(os.environ.get('SCRAPE_CACHE_TTL', 15))  # seconds
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 1))  # proxies appending to X-Forwarded-For
+SCORECARD_MODE = os.environ.get('SCORECARD_MODE', 'title')  # 'title' or 'full'
+HTML_PARSER = None  # resolved on first parse, see html_parser()
+PARSE_PROCESSES = int(os.environ.get('PARSE_PROCESSES', 0))  # >0 parses pages in a process pool
+PARSE_POOL = None
+PARSE_POOL_LOCK = threading.Lock()
+
+# Startup state (see start_background_tasks / warmup)
+WARMUP_DONE = threading.Event()
+BACKGROUND_STARTED = False
+BACKGROUND_LOCK = threading.Lock()
 
 class Colors:
     """Terminal colors"""
@@ -244,25 +243,187 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def html_parser():
+    """Fastest BeautifulSoup tree builder available (lxml, else html.parser)"""
+    global HTML_PARSER
+    if HTML_PARSER is None:
+        try:
+            import lxml  # noqa: F401
+            HTML_PARSER = 'lxml'
+        except ImportError:
+            HTML_PARSER = 'html.parser'
+    return HTML_PARSER
+
+def title_strainer():
+    from bs4 import SoupStrainer
+    return SoupStrainer('title')
+
+SCORECARD_CLASSES = re.compile(r'fow|fall|recent|this-over|overs-timeline', re.I)
+
+def scorecard_strainer():
+    """Keep <title>, tables and the fall-of-wickets / recent-balls blocks"""
+    from bs4 import SoupStrainer
+    
+    def wanted(name, attrs):
+        if name in ('title', 'table'):
+            return True
+        classes = attrs.get('class') or ''
+        if isinstance(classes, list):
+            classes = ' '.join(classes)
+        return bool(SCORECARD_CLASSES.search(classes))
+    
+    return SoupStrainer(wanted)
+
+TITLE_ELEMENT = re.compile(r'<title[^>]*>.*?</title\s*>', re.I | re.S)
+
+def title_fragment(html):
+    """Just the <title> element; title-only parses need nothing else"""
+    match = TITLE_ELEMENT.search(html)
+    return match.group(0) if match else html
+
+class SourceLatency:
+    """Rolling latency samples for one upstream URL"""
+    
+    def __init__(self, size=50):
+        self.samples = deque(maxlen=size)
+        self.failures = 0
+    
+    def record(self, seconds, ok=True):
+        self.samples.append(seconds)
+        if not ok:
+            self.failures += 1
+    
+    def percentile(self, pct):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
 class CricketScraper:
-    def __init__(self):
+    TIMEOUT = 10  # seconds per upstream request
+    HEDGE_DEFAULT_DELAY = 2.0  # used until a source has enough samples
+    HEDGE_MIN_DELAY = 0.25
+    HEDGE_MIN_SAMPLES = 5
+    
+    def __init__(self, cache=None, max_sources=200):
+        self.cache = cache  # optional PageCache for raw pages
+        self.max_sources = max_sources
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
         }
+        self.latency = OrderedDict()  # url -> SourceLatency, least recently used first
+        self.latency_lock = threading.Lock()
+        self.fetch_pool = None
+    
+    def source_latency(self, url):
+        with self.latency_lock:
+            if url not in self.latency:
+                self.latency[url] = SourceLatency()
+                # /api/scrape takes arbitrary URLs; keep the stats bounded
+                while len(self.latency) > self.max_sources:
+                    self.latency.popitem(last=False)
+            self.latency.move_to_end(url)
+            return self.latency[url]
+    
+    def sources(self):
+        with self.latency_lock:
+            return list(self.latency.items())
+    
+    def forget_sources(self, urls):
+        with self.latency_lock:
+            for url in urls:
+                self.latency.pop(url, None)
+    
+    def hedge_delay(self, url):
+        """How long to wait on a source before firing a hedged request"""
+        stats = self.source_latency(url)
+        p95 = stats.percentile(95)
+        if p95 is None or len(stats.samples) < self.HEDGE_MIN_SAMPLES:
+            return self.HEDGE_DEFAULT_DELAY
+        return min(max(p95, self.HEDGE_MIN_DELAY), self.TIMEOUT)
+    
+    def rank_sources(self, urls):
+        """Order equivalent URLs so the historically fastest one goes first"""
+        def score(url):
+            stats = self.source_latency(url)
+            p50 = stats.percentile(50)
+            return (p50 if p50 is not None else self.HEDGE_DEFAULT_DELAY) + stats.failures * self.TIMEOUT / 10
+        # sorted() is stable, so untried sources keep their given order
+        return sorted(dict.fromkeys(urls), key=score)
+    
+    def fetch_one(self, url):
+        """GET a single source, recording its latency"""
+        import requests
         
-    def scrape_crex_scores(self, match_url):
-        """Scrape live scores from CREX"""
+        started = time.monotonic()
         try:
-            response = requests.get(match_url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Get the title which contains score information
-            title_elem = soup.find('title')
-            title_text = title_elem.text.strip() if title_elem else ""
+            response = requests.get(url, headers=self.headers, timeout=self.TIMEOUT)
+            response.raise_for_status()
+        except Exception:
+            self.source_latency(url).record(time.monotonic() - started, ok=False)
+            raise
+        self.source_latency(url).record(time.monotonic() - started)
+        if self.cache is not None:
+            self.cache.put(url, response.text)
+        return response.text
+    
+    def fetch_hedged(self, urls, use_cache=True):
+        """Fetch the first of several equivalent URLs to answer
+        
+        The primary is requested first; if it has not answered within its
+        p95 latency (or it fails) the next source is fired as well, and the
+        first successful response wins. use_cache=False skips the page-cache
+        lookup (live polling must reach upstream); fetched pages are still
+        written to the cache.
+        """
+        if use_cache and self.cache is not None:
+            for url in urls:
+                html = self.cache.get(url)
+                if html is not None:
+                    return html
+        
+        sources = self.rank_sources(urls)
+        if len(sources) == 1:
+            return self.fetch_one(sources[0])
+        
+        if self.fetch_pool is None:
+            self.fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fetch')
+        
+        pending = {}
+        next_source = 0
+        last_error = None
+        
+        while True:
+            if next_source < len(sources):
+                url = sources[next_source]
+                pending[self.fetch_pool.submit(self.fetch_one, url)] = url
+                next_source += 1
+                timeout = self.hedge_delay(url) if next_source < len(sources) else None
+            elif not pending:
+                raise last_error
+            else:
+                timeout = None
             
-            # Parse the title to extract match data
-            data = self.parse_title_data(title_text)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+    
+    def scrape_crex_scores(self, match_url, alternates=None, full=False, use_cache=True):
+        """Scrape live scores from CREX
+        
+        alternates are equivalent pages for the same match; they are used as
+        hedged sources when the primary is slow. full=True also extracts the
+        scorecard (bowling figures, fall of wickets, recent balls).
+        """
+        try:
+            with timed('fetch'):
+                html = self.fetch_hedged([match_url] + list(alternates or []), use_cache=use_cache)
+            data = self.parse(html, full=full)
             data['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             return data
@@ -270,6 +431,117 @@ class CricketScraper:
         except Exception as e:
             print(f"{Colors.FAIL}Error scraping: {str(e)}{Colors.ENDC}")
             return None
+    
+    def parse(self, html, full=False):
+        """parse_page, on the process pool when PARSE_PROCESSES is set
+        
+        BeautifulSoup holds the GIL, so with many tracked matches the poll
+        threads end up parsing one page at a time. Worker processes parse in
+        parallel and only the small snapshot dict comes back.
+        """
+        if not full:
+            html = title_fragment(html)
+        if PARSE_PROCESSES <= 0:
+            return self.parse_page(html, full=full)
+        
+        try:
+            with timed('parse_process'):
+                return parse_pool().submit(parse_in_worker, html, full).result()
+        except BrokenProcessPool:
+            print(f"{Colors.WARNING}[Parse] Worker process died; restarting the pool{Colors.ENDC}")
+            reset_parse_pool()
+            return self.parse_page(html, full=full)
+    
+    def parse_page(self, html, full=False):
+        """Parse a CREX page into a snapshot dict (no timestamp)"""
+        from bs4 import BeautifulSoup
+        
+        # Only build the parts of the DOM we read; the full page is mostly
+        # scripts, ads and navigation.
+        strainer = scorecard_strainer() if full else title_strainer()
+        with timed('soup'):
+            soup = BeautifulSoup(html, html_parser(), parse_only=strainer)
+        
+        # Get the title which contains score information
+        title_elem = soup.find('title')
+        title_text = title_elem.text.strip() if title_elem else ""
+        
+        # Parse the title to extract match data
+        with timed('parse_title'):
+            data = self.parse_title_data(title_text)
+        if full:
+            with timed('scorecard'):
+                data.update(self.parse_scorecard(soup))
+        
+        return data
+    
+    def parse_scorecard(self, soup):
+        """Extract bowling figures, fall of wickets and recent balls
+        
+        Tables are recognised by their header cells rather than CSS classes,
+        so cosmetic changes to the CREX markup don't break extraction.
+        """
+        data = {
+            'bowling': [],
+            'fall_of_wickets': [],
+            'recent_balls': []
+        }
+        
+        for table in soup.find_all('table'):
+            rows = [[cell.get_text(' ', strip=True) for cell in tr.find_all(['th', 'td'])] for tr in table.find_all('tr')]
+            rows = [row for row in rows if row]
+            if not rows:
+                continue
+            
+            header = [cell.upper() for cell in rows[0]]
+            if {'O', 'R', 'W'} <= set(header) and ('ECO' in header or 'ECON' in header):
+                # A later bowling table belongs to a later innings; keep the latest
+                data['bowling'] = [
+                    bowler for bowler in (self.parse_bowler_row(header, row) for row in rows[1:]) if bowler
+                ]
+        
+        # Current bowlers are the last two to have bowled in the innings
+        for slot, bowler in zip(('bowlerone', 'bowlertwo'), reversed(data['bowling'][-2:])):
+            data[slot] = bowler['name']
+            data[f'{slot}over'] = bowler['overs']
+            data[f'{slot}run'] = bowler['runs']
+            data[f'{slot}wickers'] = bowler['wickets']
+            data[f'{slot}economy'] = bowler['economy']
+        
+        # As with bowling, the last fall-of-wickets block is the current innings
+        for elem in soup.find_all(class_=re.compile(r'fow|fall', re.I)):
+            text = elem.get_text(' ', strip=True)
+            wickets = [
+                {'score': score, 'wicket': wicket, 'batsman': batsman.strip(), 'overs': overs}
+                for score, wicket, batsman, overs in re.findall(r'(\d+)-(\d+)\s*\(([^,()]+),\s*(\d+(?:\.\d+)?)', text)
+            ]
+            if wickets:
+                data['fall_of_wickets'] = wickets
+        
+        for elem in soup.find_all(class_=re.compile(r'recent|this-over|overs-timeline', re.I)):
+            balls = [
+                ball.get_text(strip=True) for ball in elem.find_all(['span', 'div', 'li'])
+                if re.fullmatch(r'\d+|W|wd|nb|lb|b|\d+(?:wd|nb|lb|b)', ball.get_text(strip=True), re.I)
+            ]
+            if balls:
+                data['recent_balls'] = balls[-12:]
+                break
+        
+        return data
+    
+    def parse_bowler_row(self, header, row):
+        """Map one bowling-table row to a figures dict using its header"""
+        if len(row) < len(header) or not row[0]:
+            return None
+        cells = dict(zip(header, row))
+        return {
+            'name': row[0],
+            'overs': cells.get('O', '0'),
+            'maidens': cells.get('M', '0'),
+            'runs': cells.get('R', '0'),
+            'wickets': cells.get('W', '0'),
+            'economy': cells.get('ECO', cells.get('ECON', '0.00'))
+        }
 
     def parse_title_data(self, title_text):
         """Parse the title text to extract match information"""
@@ -345,8 +617,8 @@ class CricketScraper:
                     data['team1_overs'] = overs_match.group(1)
                     print(f"Debug - Team1 overs: {data['team1_overs']}")
                 
-                # Extract batsmen information - everything after the last space before batsmen section
-                batsmen_match = re.search(r'\(([^)]+)\)', team1_full)
+                # Extract batsmen information - the parenthesised group holding "Name runs(balls)" entries
+                batsmen_match = re.search(r'\(((?:[^()]*\(\d+\))+[^()]*)\)', team1_full)
                 if batsmen_match:
                     batsmen_str = batsmen_match.group(1)
                     print(f"Debug - Batsmen string: {batsmen_str}")
@@ -444,23 +716,1525 @@ class CricketScraper:
             import traceback
             traceback.print_exc()
         
-        print(f"\nDebug - Final data:")
-        print(f"  Team1: {data['team1_name']} {data['team1_score']}-{data['team1_wickets']} ({data['team1_overs']})")
-        print(f"  Team2: {data['team2_name']} {data['team2_score']}-{data['team2_wickets']} ({data['team2_overs']})")
-        print(f"  Batsman1: {data['batterone']} - {data['batsmanonerun']}{data['batsmanoneball']} SR: {data['batsmanonesr']}")
-        print(f"  Batsman2: {data['battertwo']} - {data['batsmantworun']}{data['batsmantwoball']} SR: {data['batsmantwosr']}")
+        print(f"\nDebug - Final data:")
+        print(f"  Team1: {data['team1_name']} {data['team1_score']}-{data['team1_wickets']} ({data['team1_overs']})")
+        print(f"  Team2: {data['team2_name']} {data['team2_score']}-{data['team2_wickets']} ({data['team2_overs']})")
+        print(f"  Batsman1: {data['batterone']} - {data['batsmanonerun']}{data['batsmanoneball']} SR: {data['batsmanonesr']}")
+        print(f"  Batsman2: {data['battertwo']} - {data['batsmantworun']}{data['batsmantwoball']} SR: {data['batsmantwosr']}")
+        
+        return data
+    
+    def overs_to_decimal(self, overs):
+        """Convert overs like '4.3' to decimal 4.5"""
+        try:
+            if '.' in overs:
+                parts = overs.split('.')
+                return int(parts[0]) + (int(parts[1]) / 6)
+            return float(overs)
+        except:
+            return 0.0
+
+class SnapshotStore:
+    """Persist tracked matches, snapshots and settings in SQLite (WAL mode)
+    
+    Writes are queued and applied by a background writer thread so the
+    poller never waits on disk. State is reloaded at boot by load().
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS matches (
+            match_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            added_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS snapshots (
+            match_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            recorded_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_match ON history (match_id, id);
+        CREATE TABLE IF NOT EXISTS players (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, path, max_pending=1000):
+        self.path = path
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.writer = None
+        self.dropped = 0
+    
+    @property
+    def enabled(self):
+        return bool(self.path)
+    
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def open(self):
+        """Create the schema and start the writer thread"""
+        if not self.enabled or self.writer:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        conn = self.connect()
+        conn.executescript(self.SCHEMA)
+        conn.close()
+        
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+    
+    def load(self):
+        """Return (settings, matches, snapshots) saved by a previous run"""
+        if not self.enabled or not os.path.exists(self.path):
+            return {}, {}, {}
+        
+        conn = self.connect()
+        try:
+            settings = {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM settings')}
+            matches = dict(conn.execute('SELECT match_id, url FROM matches'))
+            snapshots = {match_id: json.loads(data) for match_id, data in conn.execute('SELECT match_id, data FROM snapshots')}
+        finally:
+            conn.close()
+        
+        return settings, matches, snapshots
+    
+    def load_players(self):
+        """Return [(key, aggregate)] saved by PlayerStats, least recently updated first"""
+        if not self.enabled or not os.path.exists(self.path):
+            return []
+        
+        conn = self.connect()
+        try:
+            return [(key, json.loads(data)) for key, data in conn.execute('SELECT key, data FROM players ORDER BY updated_at')]
+        except sqlite3.OperationalError:
+            # Database from before the players table existed
+            return []
+        finally:
+            conn.close()
+    
+    def save_player(self, key, record):
+        self._enqueue(
+            'INSERT OR REPLACE INTO players (key, data, updated_at) VALUES (?, ?, ?)',
+            (key, json.dumps(record), time.time())
+        )
+    
+    def forget_player(self, key):
+        self._enqueue('DELETE FROM players WHERE key = ?', (key,))
+    
+    def save_setting(self, key, value):
+        self._enqueue(
+            'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+            (key, json.dumps(value))
+        )
+    
+    def save_match(self, match_id, url):
+        self._enqueue(
+            'INSERT OR REPLACE INTO matches (match_id, url, added_at) VALUES (?, ?, ?)',
+            (match_id, url, time.time())
+        )
+    
+    def forget_match(self, match_id, keep_snapshot=False, keep_history=False):
+        """Stop tracking a match and drop its stored data
+        
+        keep_snapshot keeps the latest snapshot and the history (a cold
+        summary); keep_history keeps only the history rows, for /api/export.
+        """
+        self._enqueue('DELETE FROM matches WHERE match_id = ?', (match_id,))
+        if not keep_snapshot:
+            self._enqueue('DELETE FROM snapshots WHERE match_id = ?', (match_id,))
+            if not keep_history:
+                self._enqueue('DELETE FROM history WHERE match_id = ?', (match_id,))
+    
+    def save_snapshot(self, match_id, data, changed=True):
+        """Store the latest snapshot; append to history when it changed"""
+        encoded = json.dumps(data)
+        now = time.time()
+        self._enqueue(
+            'INSERT OR REPLACE INTO snapshots (match_id, data, updated_at) VALUES (?, ?, ?)',
+            (match_id, encoded, now)
+        )
+        if changed:
+            self._enqueue(
+                'INSERT INTO history (match_id, data, recorded_at) VALUES (?, ?, ?)',
+                (match_id, encoded, now)
+            )
+    
+    def iter_history(self, match_ids=None, since=None, until=None, batch=500):
+        """Yield lists of (id, match_id, raw JSON data, recorded_at) history rows
+        
+        Pages through the table by id on its own connection, so memory stays
+        at one batch and no read transaction is held between batches.
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        
+        where = ['id > ?']
+        params = []
+        if match_ids:
+            where.append(f"match_id IN ({','.join('?' * len(match_ids))})")
+            params += list(match_ids)
+        if since is not None:
+            where.append('recorded_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('recorded_at < ?')
+            params.append(until)
+        sql = f"SELECT id, match_id, data, recorded_at FROM history WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+        
+        conn = self.connect()
+        try:
+            last_id = 0
+            while True:
+                rows = conn.execute(sql, [last_id] + params + [batch]).fetchall()
+                if not rows:
+                    return
+                yield rows
+                last_id = rows[-1][0]
+        finally:
+            conn.close()
+    
+    def _enqueue(self, sql, params):
+        if not self.enabled:
+            return
+        try:
+            self.pending.put_nowait((sql, params))
+        except queue.Full:
+            self.dropped += 1
+    
+    def _write_loop(self):
+        conn = self.connect()
+        while True:
+            batch = [self.pending.get()]
+            # Drain whatever else is waiting so bursts share one transaction
+            while len(batch) < 500:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"{Colors.FAIL}[Store] Write failed: {str(e)}{Colors.ENDC}")
+
+def to_int(value, default=0):
+    try:
+        return int(str(value).strip('()'))
+    except (TypeError, ValueError):
+        return default
+
+def overs_to_balls(overs):
+    """'25.5' overs -> 155 balls"""
+    whole, _, balls = str(overs or '0').partition('.')
+    return to_int(whole) * 6 + to_int(balls or 0)
+
+# Columns for CSV export, straight from the snapshot fields
+EXPORT_FIELDS = (
+    'team1_name', 'team1_score', 'team1_wickets', 'team1_overs',
+    'team2_name', 'team2_score', 'team2_wickets', 'team2_overs',
+    'update', 'runrate',
+    'batterone', 'batsmanonerun', 'batsmanoneball',
+    'battertwo', 'batsmantworun', 'batsmantwoball',
+    'bowlerone', 'bowleroneover', 'bowleronerun', 'bowleronewickers',
+    'timestamp',
+)
+
+# Fixed-width columns of the columnar export: (name, struct code, value from snapshot data)
+COLUMNAR_FIELDS = (
+    ('team1_runs', 'H', lambda d: to_int(d.get('team1_score'))),
+    ('team1_wickets', 'B', lambda d: to_int(d.get('team1_wickets'))),
+    ('team1_balls', 'H', lambda d: overs_to_balls(d.get('team1_overs'))),
+    ('team2_runs', 'H', lambda d: to_int(d.get('team2_score'))),
+    ('team2_wickets', 'B', lambda d: to_int(d.get('team2_wickets'))),
+    ('team2_balls', 'H', lambda d: overs_to_balls(d.get('team2_overs'))),
+    ('bat1_runs', 'H', lambda d: to_int(d.get('batsmanonerun'))),
+    ('bat1_balls', 'H', lambda d: to_int(d.get('batsmanoneball'))),
+    ('bat2_runs', 'H', lambda d: to_int(d.get('batsmantworun'))),
+    ('bat2_balls', 'H', lambda d: to_int(d.get('batsmantwoball'))),
+)
+COLUMNAR_MAGIC = b'CRXC\x01'
+
+def export_ndjson(batches):
+    # The stored JSON is spliced in as-is rather than parsed and re-encoded
+    for rows in batches:
+        yield ''.join(
+            f'{{"id":{row_id},"match_id":{json.dumps(match_id)},"recorded_at":{recorded_at},"data":{data}}}\n'
+            for row_id, match_id, data, recorded_at in rows
+        )
+
+def export_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('id', 'match_id', 'recorded_at') + EXPORT_FIELDS)
+    for rows in batches:
+        for row_id, match_id, data, recorded_at in rows:
+            data = json.loads(data)
+            writer.writerow([row_id, match_id, recorded_at] + [data.get(field, '') for field in EXPORT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_columnar(batches):
+    """Little-endian column blocks, one per history batch
+    
+    File:  b'CRXC' version:u8  block*  b'END' rows:u64
+    Block: b'BLK' n:u32  match-id table (count:u16, then len:u16 + UTF-8 each)
+           id:i64[n]  recorded_at:f64[n]  match:u16[n] (index into the table)
+           then one array per COLUMNAR_FIELDS entry, in order, with values
+           clamped to the column width.
+    """
+    yield COLUMNAR_MAGIC
+    total = 0
+    for rows in batches:
+        n = len(rows)
+        total += n
+        match_ids = list(dict.fromkeys(row[1] for row in rows))
+        index = {match_id: i for i, match_id in enumerate(match_ids)}
+        parts = [b'BLK', struct.pack('<IH', n, len(match_ids))]
+        for match_id in match_ids:
+            encoded = match_id.encode('utf-8')
+            parts.append(struct.pack('<H', len(encoded)) + encoded)
+        parts.append(struct.pack(f'<{n}q', *(row[0] for row in rows)))
+        parts.append(struct.pack(f'<{n}d', *(row[3] for row in rows)))
+        parts.append(struct.pack(f'<{n}H', *(index[row[1]] for row in rows)))
+        
+        decoded = [json.loads(row[2]) for row in rows]
+        for _, code, value in COLUMNAR_FIELDS:
+            limit = 0xFF if code == 'B' else 0xFFFF
+            parts.append(struct.pack(f'<{n}{code}', *(min(max(value(d), 0), limit) for d in decoded)))
+        yield b''.join(parts)
+    yield b'END' + struct.pack('<Q', total)
+
+EXPORT_FORMATS = {
+    # format -> (generator, mimetype, file extension)
+    'ndjson': (export_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (export_csv, 'text/csv', 'csv'),
+    'columnar': (export_columnar, 'application/octet-stream', 'crxc'),
+}
+
+class PageCache:
+    """Content-addressed on-disk cache of raw upstream pages
+    
+    Each distinct page body is stored once, gzipped, under objects/ and named
+    by its hash. A SQLite index maps every URL to the pages fetched from it,
+    so a URL fetched again within the TTL is answered from disk, and old
+    pages stay around for re-parsing until the cache outgrows max_bytes.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS objects (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS fetches (
+            url TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at);
+        CREATE INDEX IF NOT EXISTS fetches_digest ON fetches (digest);
+    """
+    
+    def __init__(self, directory, ttl=10, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.conn = None
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'deduplicated': 0, 'evicted': 0}
+    
+    @property
+    def enabled(self):
+        return bool(self.directory)
+    
+    def _open(self):
+        # Called with self.lock held
+        if self.conn is None:
+            os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+            self.conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=10, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript(self.SCHEMA)
+        return self.conn
+    
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest + '.gz')
+    
+    def read_object(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as handle:
+            return handle.read().decode('utf-8')
+    
+    def get(self, url):
+        """The cached page for url if it was fetched within the TTL, else None"""
+        if not self.enabled or self.ttl <= 0:
+            return None
+        
+        with self.lock:
+            conn = self._open()
+            row = conn.execute(
+                'SELECT digest, fetched_at FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1', (url,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.stats['misses'] += 1
+                return None
+            conn.execute('UPDATE objects SET last_used = ? WHERE digest = ?', (time.time(), row[0]))
+            conn.commit()
+        
+        try:
+            html = self.read_object(row[0])
+        except OSError:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return html
+    
+    def put(self, url, html):
+        """Record a fresh fetch of url, storing the body if it is new"""
+        if not self.enabled:
+            return
+        
+        raw = html.encode('utf-8')
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        path = self.object_path(digest)
+        now = time.time()
+        
+        with self.lock:
+            conn = self._open()
+            known = conn.execute('SELECT 1 FROM objects WHERE digest = ?', (digest,)).fetchone()
+            if known and os.path.exists(path):
+                self.stats['deduplicated'] += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp = f"{path}.{threading.get_ident()}.tmp"
+                with gzip.open(temp, 'wb', compresslevel=6) as handle:
+                    handle.write(raw)
+                os.replace(temp, path)
+                self.stats['stored'] += 1
+            
+            conn.execute(
+                'INSERT OR REPLACE INTO objects (digest, size, last_used) VALUES (?, ?, ?)',
+                (digest, os.path.getsize(path), now)
+            )
+            # An unchanged page only moves the URL's TTL forward
+            latest = conn.execute(
+                'SELECT rowid, digest FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1', (url,)
+            ).fetchone()
+            if latest and latest[1] == digest:
+                conn.execute('UPDATE fetches SET fetched_at = ? WHERE rowid = ?', (now, latest[0]))
+            else:
+                conn.execute('INSERT INTO fetches (url, digest, fetched_at) VALUES (?, ?, ?)', (url, digest, now))
+            self._evict(conn)
+            conn.commit()
+    
+    def _evict(self, conn):
+        """Drop least recently used pages until the cache is back under 90% of max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        target = self.max_bytes * 0.9
+        victims = []
+        for digest, size in conn.execute('SELECT digest, size FROM objects ORDER BY last_used'):
+            if total <= target:
+                break
+            victims.append(digest)
+            total -= size
+        
+        for digest in victims:
+            try:
+                os.remove(self.object_path(digest))
+            except OSError:
+                pass
+        conn.executemany('DELETE FROM objects WHERE digest = ?', [(d,) for d in victims])
+        conn.executemany('DELETE FROM fetches WHERE digest = ?', [(d,) for d in victims])
+        self.stats['evicted'] += len(victims)
+    
+    def entries(self):
+        """Every cached page as (digest, [urls], last fetched_at)"""
+        if not self.enabled or not os.path.exists(os.path.join(self.directory, 'index.db')):
+            return []
+        
+        pages = {}  # digest -> (urls, last fetched_at), in first-seen order
+        with self.lock:
+            for digest, url, fetched_at in self._open().execute('SELECT digest, url, fetched_at FROM fetches ORDER BY fetched_at'):
+                urls, _ = pages.get(digest, ([], 0))
+                if url not in urls:
+                    urls.append(url)
+                pages[digest] = (urls, fetched_at)
+        return [(digest, urls, fetched_at) for digest, (urls, fetched_at) in pages.items()]
+    
+    def describe(self):
+        if not self.enabled:
+            return {"enabled": False}
+        
+        with self.lock:
+            objects, size = self._open().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects').fetchone()
+        return {
+            "enabled": True,
+            "ttl": self.ttl,
+            "objects": objects,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            **self.stats,
+        }
+
+class EventDetector:
+    """Turn successive snapshots of one match into typed cricket events
+    
+    Only the previous snapshot's key numbers are kept, so each update costs
+    the same regardless of how long the match has been running. Events go
+    into a bounded ring buffer and carry a per-match sequence number.
+    """
+    
+    MILESTONES = (50, 100, 150, 200)
+    PARTNERSHIP_STEP = 50
+    
+    def __init__(self, match_id, size=200):
+        self.match_id = match_id
+        self.events = deque(maxlen=size)
+        # Like snapshot versions, sequence numbers start from the clock
+        self.seq = int(time.time() * 1000)
+        self.lock = threading.Lock()
+        self.state = None
+    
+    def feed(self, data, version=None, emit=True):
+        """Record data as the latest snapshot; returns the new events"""
+        batting = data.get('team1_name')
+        score = to_int(data.get('team1_score'))
+        wickets = to_int(data.get('team1_wickets'))
+        target = to_int(data.get('team2_score')) + 1 if to_int(data.get('team2_score')) else None
+        batsmen = {}
+        for name_key, runs_key, balls_key in (('batterone', 'batsmanonerun', 'batsmanoneball'),
+                                              ('battertwo', 'batsmantworun', 'batsmantwoball')):
+            name = data.get(name_key)
+            if name and name not in ('Batsman 1', 'Batsman 2'):
+                batsmen[name] = (to_int(data.get(runs_key)), to_int(data.get(balls_key)))
+        
+        with self.lock:
+            prev = self.state
+            events = []
+            
+            if prev is not None and emit:
+                new_innings = batting != prev['batting']
+                if new_innings:
+                    events.append(('innings_change', f"{batting} are batting", {'team': batting}))
+                    partnership_base = score
+                else:
+                    partnership_base = prev['partnership_base']
+                    
+                    if wickets > prev['wickets']:
+                        out = [name for name in prev['batsmen'] if name not in batsmen]
+                        for n in range(prev['wickets'] + 1, wickets + 1):
+                            batsman = out.pop(0) if out else None
+                            text = f"Wicket! {batting} {score}-{n}" + (f" ({batsman} out)" if batsman else "")
+                            events.append(('wicket', text, {'team': batting, 'score': score, 'wicket': n, 'batsman': batsman}))
+                        partnership_base = score
+                    
+                    for name, (runs, balls) in batsmen.items():
+                        old_runs, old_balls = prev['batsmen'].get(name, (None, None))
+                        if old_runs is None:
+                            continue
+                        if runs - old_runs in (4, 6) and balls - old_balls == 1:
+                            kind = 'six' if runs - old_runs == 6 else 'four'
+                            events.append(('boundary', f"{name} hits a {kind}", {'batsman': name, 'runs': runs - old_runs}))
+                        for milestone in self.MILESTONES:
+                            if old_runs < milestone <= runs:
+                                events.append(('milestone', f"{milestone} for {name}", {'batsman': name, 'runs': runs, 'balls': balls, 'milestone': milestone}))
+                    
+                    old_stand = prev['score'] - prev['partnership_base']
+                    stand = score - partnership_base
+                    if wickets == prev['wickets'] and stand // self.PARTNERSHIP_STEP > old_stand // self.PARTNERSHIP_STEP:
+                        reached = stand // self.PARTNERSHIP_STEP * self.PARTNERSHIP_STEP
+                        events.append(('partnership', f"{reached} partnership for {batting}", {'team': batting, 'runs': stand, 'milestone': reached}))
+                
+                if target and score >= target and not (prev['target'] == target and prev['score'] >= target and not new_innings):
+                    events.append(('target_reached', f"{batting} reach the target of {target}", {'team': batting, 'score': score, 'target': target}))
+            else:
+                partnership_base = score if prev is None else prev['partnership_base']
+            
+            self.state = {
+                'batting': batting,
+                'score': score,
+                'wickets': wickets,
+                'target': target,
+                'batsmen': batsmen,
+                'partnership_base': partnership_base
+            }
+            
+            emitted = []
+            for event_type, text, details in events:
+                self.seq += 1
+                event = {
+                    'seq': self.seq,
+                    'type': event_type,
+                    'text': text,
+                    'match_id': self.match_id,
+                    'version': version,
+                    'timestamp': data.get('timestamp')
+                }
+                event.update(details)
+                self.events.append(event)
+                emitted.append(event)
+            return emitted
+    
+    def since(self, after):
+        """Events with a sequence number greater than after"""
+        return [event for event in list(self.events) if event['seq'] > after]
+
+WEBHOOK_ALLOW_PRIVATE = os.environ.get('WEBHOOK_ALLOW_PRIVATE') == '1'  # local development only
+
+def webhook_target_error(url):
+    """Why url may not receive webhooks, or None when it is a public http(s) endpoint
+    
+    Every address the host resolves to must be public, so subscribers can't
+    point the server at loopback, the private network or cloud metadata.
+    """
+    parsed = urlsplit(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return "A http(s) webhook URL is required"
+    if WEBHOOK_ALLOW_PRIVATE:
+        return None
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError, UnicodeError):
+        return f"Cannot resolve {parsed.hostname}"
+    for address in addresses:
+        if not ipaddress.ip_address(address.split('%')[0]).is_global:
+            return f"{parsed.hostname} resolves to a non-public address"
+    return None
+
+class WebhookDispatcher:
+    """Push snapshot changes to subscribed URLs without blocking the poller
+    
+    notify() only appends to a per-endpoint buffer. A scheduler thread
+    releases each endpoint after a short batching window (or its retry
+    backoff) to a fixed pool of delivery workers, which POST everything
+    buffered so far as one batch. Each endpoint has at most one delivery in
+    flight; batches that keep failing end up in dead_letters.
+    """
+    
+    def __init__(self, workers=4, batch_window=0.5, max_batch=20, max_attempts=5, timeout=5):
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        
+        self.subscriptions = {}  # sub_id -> subscription dict
+        self.buffers = {}  # sub_id -> list of pending updates
+        self.attempts = {}  # sub_id -> consecutive failures
+        self.scheduled = set()  # sub_ids waiting in the timer heap or ready queue
+        self.dead_letters = deque(maxlen=100)
+        self.stats = {'delivered': 0, 'failed': 0, 'dead': 0}
+        
+        self.lock = threading.Lock()
+        self.timers = []  # heap of (due, sub_id)
+        self.timer_wakeup = threading.Condition(self.lock)
+        self.ready = queue.Queue()
+        self.started = False
+    
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        threading.Thread(target=self._schedule_loop, daemon=True).start()
+        for _ in range(self.workers):
+            threading.Thread(target=self._deliver_loop, daemon=True).start()
+    
+    def subscribe(self, match_id, url, sub_id=None):
+        subscription = {
+            'id': sub_id or uuid.uuid4().hex[:12],
+            'match_id': match_id,
+            'url': url,
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        with self.lock:
+            self.subscriptions[subscription['id']] = subscription
+        return subscription
+    
+    def unsubscribe(self, sub_id):
+        with self.lock:
+            self.buffers.pop(sub_id, None)
+            self.attempts.pop(sub_id, None)
+            return self.subscriptions.pop(sub_id, None)
+    
+    def notify(self, match_id, update):
+        """Queue update for every subscriber of match_id (or of '*')"""
+        if not self.subscriptions:
+            return
+        self.start()
+        
+        with self.lock:
+            for sub_id, subscription in self.subscriptions.items():
+                if subscription['match_id'] not in (match_id, '*'):
+                    continue
+                buffer = self.buffers.setdefault(sub_id, [])
+                buffer.append(update)
+                # Keep only the newest updates for a subscriber that has fallen behind
+                del buffer[:-self.max_batch]
+                if sub_id not in self.scheduled:
+                    self._schedule(sub_id, self.batch_window)
+    
+    def describe(self):
+        with self.lock:
+            return [
+                dict(subscription, pending=len(self.buffers.get(sub_id, [])),
+                     failures=self.attempts.get(sub_id, 0))
+                for sub_id, subscription in self.subscriptions.items()
+            ]
+    
+    def _schedule(self, sub_id, delay):
+        # Caller holds self.lock
+        self.scheduled.add(sub_id)
+        heapq.heappush(self.timers, (time.monotonic() + delay, sub_id))
+        self.timer_wakeup.notify()
+    
+    def _schedule_loop(self):
+        with self.lock:
+            while True:
+                if not self.timers:
+                    self.timer_wakeup.wait()
+                    continue
+                due, sub_id = self.timers[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.timer_wakeup.wait(delay)
+                    continue
+                heapq.heappop(self.timers)
+                self.ready.put(sub_id)
+    
+    def _deliver_loop(self):
+        import requests
+        
+        while True:
+            sub_id = self.ready.get()
+            with self.lock:
+                subscription = self.subscriptions.get(sub_id)
+                batch = self.buffers.pop(sub_id, [])
+                if subscription is None or not batch:
+                    self.scheduled.discard(sub_id)
+                    continue
+            
+            # Re-checked per delivery: DNS may have changed since subscribe
+            error = webhook_target_error(subscription['url'])
+            try:
+                if error is None:
+                    response = requests.post(
+                        subscription['url'],
+                        json={'subscription': sub_id, 'updates': batch},
+                        timeout=self.timeout,
+                        allow_redirects=False
+                    )
+                    if response.status_code >= 300:
+                        error = f"HTTP {response.status_code}"
+            except Exception as e:
+                error = str(e)
+            
+            with self.lock:
+                if sub_id not in self.subscriptions:
+                    self.scheduled.discard(sub_id)
+                    continue
+                
+                if error is None:
+                    self.stats['delivered'] += 1
+                    self.attempts.pop(sub_id, None)
+                    if self.buffers.get(sub_id):
+                        self._schedule(sub_id, self.batch_window)
+                    else:
+                        self.scheduled.discard(sub_id)
+                    continue
+                
+                self.stats['failed'] += 1
+                attempts = self.attempts.get(sub_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self.stats['dead'] += 1
+                    self.attempts.pop(sub_id, None)
+                    self.dead_letters.append({
+                        'subscription': subscription,
+                        'updates': batch,
+                        'error': error,
+                        'failed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    })
+                    if self.buffers.get(sub_id):
+                        self._schedule(sub_id, self.batch_window)
+                    else:
+                        self.scheduled.discard(sub_id)
+                    continue
+                
+                # Put the batch back in front of anything that arrived meanwhile
+                self.attempts[sub_id] = attempts
+                self.buffers[sub_id] = (batch + self.buffers.get(sub_id, []))[-self.max_batch:]
+                backoff = min(60, 2 ** attempts) * random.uniform(0.8, 1.2)
+                self._schedule(sub_id, backoff)
+            
+            print(f"{Colors.WARNING}[Webhooks] Delivery to {subscription['url']} failed ({error}), attempt {attempts}{Colors.ENDC}")
+
+PLACEHOLDER_PLAYER = re.compile(r'^(?:Batsman|Bowler|Team) \d$')  # parse_title_data defaults
+RUN_RATES = re.compile(r'(CRR|RRR):\s*([\d.]+)')
+MAX_SNAPSHOT_VIEWS = 16  # cached (profile, fields) encodings per snapshot
+
+def to_float(value, default=0.0):
+    try:
+        return float(str(value).strip('()'))
+    except (TypeError, ValueError):
+        return default
+
+def compact_profile(data):
+    """Short keys and numeric values; drops the title, livescore and placeholder players"""
+    compact = {
+        't1': data.get('team1_name'),
+        'r1': to_int(data.get('team1_score')),
+        'w1': to_int(data.get('team1_wickets')),
+        'o1': to_float(data.get('team1_overs')),
+        't2': data.get('team2_name'),
+        'r2': to_int(data.get('team2_score')),
+        'w2': to_int(data.get('team2_wickets')),
+        'o2': to_float(data.get('team2_overs')),
+        'st': data.get('update'),
+    }
+    for label, rate in RUN_RATES.findall(data.get('runrate') or ''):
+        compact[label.lower()] = to_float(rate)
+    
+    compact['bat'] = [
+        {'n': data[name], 'r': to_int(data.get(runs)), 'b': to_int(data.get(balls)), 'sr': to_float(data.get(sr))}
+        for name, runs, balls, sr in (('batterone', 'batsmanonerun', 'batsmanoneball', 'batsmanonesr'),
+                                      ('battertwo', 'batsmantworun', 'batsmantwoball', 'batsmantwosr'))
+        if data.get(name) and not PLACEHOLDER_PLAYER.match(data[name])
+    ]
+    compact['bowl'] = [
+        {'n': data[name], 'o': to_float(data.get(prefix + 'over')), 'r': to_int(data.get(prefix + 'run')),
+         'w': to_int(data.get(prefix + 'wickers')), 'eco': to_float(data.get(prefix + 'economy'))}
+        for name, prefix in (('bowlerone', 'bowlerone'), ('bowlertwo', 'bowlertwo'))
+        if data.get(name) and not PLACEHOLDER_PLAYER.match(data[name])
+    ]
+    compact['ts'] = data.get('timestamp')
+    return compact
+
+PAYLOAD_PROFILES = {
+    'full': dict,
+    'compact': compact_profile,
+}
+
+def encode_json(data):
+    """UTF-8 JSON with sorted keys and compact separators, as jsonify emits outside debug mode"""
+    return app.json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+class Snapshot:
+    """One published version of a match's data
+    
+    A snapshot never changes after it is built. Publishing rebinds a single
+    reference (SNAPSHOTS[match_id], CURRENT_SNAPSHOT), so a reader that takes
+    one reference sees data, version and serialized body from the same
+    update without locking.
+    """
+    
+    __slots__ = ('match_id', 'version', 'data', 'body', 'etag', 'views')
+    
+    def __init__(self, match_id, version, data):
+        data = dict(data)
+        # Encoded once, compact like a production jsonify body
+        body = encode_json(data)
+        for name, value in (('match_id', match_id), ('version', version),
+                            ('data', MappingProxyType(data)), ('body', body),
+                            ('etag', hashlib.blake2b(body, digest_size=8).hexdigest()),
+                            ('views', {})):
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable")
+    
+    def __bool__(self):
+        return bool(self.data)
+    
+    def to_dict(self):
+        return dict(self.data)
+    
+    def view(self, profile='full', fields=None):
+        """Serialized body for a payload profile, optionally projected to fields
+        
+        Each (profile, fields) pair is encoded on first request and the bytes
+        are reused for the rest of this version's life.
+        """
+        if profile == 'full' and not fields:
+            return self.body
+        
+        key = (profile, fields)
+        body = self.views.get(key)
+        if body is None:
+            data = PAYLOAD_PROFILES[profile](self.data)
+            if fields:
+                data = {name: value for name, value in data.items() if name in fields}
+            body = encode_json(data)
+            if len(self.views) < MAX_SNAPSHOT_VIEWS:
+                self.views[key] = body
+        return body
+
+class TokenBucket:
+    """Classic token bucket: rate tokens per second, up to burst"""
+    
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+    
+    def take(self):
+        """Consume a token; returns seconds to wait (0 when allowed)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else 60
+
+class RateLimiter:
+    """Token buckets keyed by client IP or target URL"""
+    
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+    
+    def check(self, key):
+        """Seconds until key may proceed (0 = allowed now)"""
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self._prune()
+                bucket = self.buckets[key] = TokenBucket(self.rate, self.burst)
+            return bucket.take()
+    
+    def _prune(self):
+        # Buckets that have refilled completely carry no state worth keeping
+        now = time.monotonic()
+        idle = [key for key, bucket in self.buckets.items()
+                if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.burst]
+        for key in idle:
+            del self.buckets[key]
+        if len(self.buckets) >= self.max_keys:
+            self.buckets.clear()
+
+class ScrapeAdmission:
+    """Bound concurrent on-demand scrapes and the queue waiting for them"""
+    
+    def __init__(self, concurrency, queue_size):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.capacity = concurrency + queue_size
+        self.admitted = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+    
+    def enter(self):
+        """Join the queue; False when it is already full"""
+        with self.lock:
+            if self.admitted >= self.capacity:
+                self.rejected += 1
+                return False
+            self.admitted += 1
+        self.slots.acquire()
+        return True
+    
+    def leave(self):
+        self.slots.release()
+        with self.lock:
+            self.admitted -= 1
+
+FINISHED_MARKERS = re.compile(r'\bwon by\b|\bwin by\b|match (?:drawn|tied)|no result|abandoned', re.I)
+
+def is_finished(data):
+    """Best-effort check whether a snapshot describes a completed match"""
+    text = f"{data.get('title', '')} {data.get('update', '')}"
+    if FINISHED_MARKERS.search(text):
+        return True
+    # Title snapshots list the chasing side first once the opponent has batted
+    target = to_int(data.get('team2_score')) + 1 if to_int(data.get('team2_score')) else None
+    return bool(target) and (to_int(data.get('team1_score')) >= target or to_int(data.get('team1_wickets')) >= 10)
+
+SIDE_SCORE = re.compile(r'\d+-\d+|\(\(?\d+(?:\.\d+)?\)')
+
+def match_innings(data):
+    """Innings started so far, counted from the title's score line
+    
+    A side has batted once it shows a score or overs; Test titles separate
+    a side's innings with '&' ("IND 250 & 45-2 (12.3)").
+    """
+    score_line = data.get('title', '').split(' | ')[0]
+    return sum(side.count('&') + 1 for side in score_line.split(' vs ', 1) if SIDE_SCORE.search(side))
+
+def score_progress(data):
+    """(innings, balls bowled) - never goes backwards in a live match
+    
+    None when the title has no score line we could parse (a result-only
+    title, a changed page layout).
+    """
+    innings = match_innings(data)
+    if not innings:
+        return None
+    return innings, sum(overs_to_balls(data.get(f'team{side}_overs')) for side in (1, 2))
+
+def is_behind(data, previous):
+    """True when data is an older page than previous, e.g. from a slow mirror
+    
+    Runs are not compared, so a scorer's correction still goes out, and
+    results or unparsed pages are never held back.
+    """
+    if is_finished(data):
+        return False
+    progress, previous_progress = score_progress(data), score_progress(previous)
+    return progress is not None and previous_progress is not None and progress < previous_progress
+
+COLD_FIELDS = (
+    'team1_name', 'team1_score', 'team1_wickets', 'team1_overs',
+    'team2_name', 'team2_score', 'team2_wickets', 'team2_overs',
+    'livescore', 'update', 'timestamp'
+)
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class SearchIndex:
+    """Inverted index of team and batter names across known matches
+    
+    Names are split into lowercase tokens. Each token maps to the matches
+    (and fields) it occurs in; a sorted token list answers prefix lookups
+    with bisect and a trigram map finds candidates for fuzzy lookups.
+    Publishing a snapshot re-indexes only that match.
+    """
+    
+    FIELDS = ('team1_name', 'team2_name', 'batterone', 'battertwo')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = {}  # token -> {match_id: set of fields}
+        self.tokens = []  # sorted keys of postings
+        self.trigrams = {}  # trigram -> set of tokens
+        self.docs = {}  # match_id -> {"names": {field: name}, "status": ...}
+    
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r'[a-z0-9]+', text.lower())
+    
+    @staticmethod
+    def grams(token):
+        padded = f"^{token}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def _add_token(self, token, match_id, field):
+        matches = self.postings.get(token)
+        if matches is None:
+            matches = self.postings[token] = {}
+            bisect.insort(self.tokens, token)
+            for gram in self.grams(token):
+                self.trigrams.setdefault(gram, set()).add(token)
+        matches.setdefault(match_id, set()).add(field)
+    
+    def _remove_match(self, match_id):
+        doc = self.docs.pop(match_id, None)
+        if doc is None:
+            return
+        for name in doc['names'].values():
+            for token in self.tokenize(name):
+                matches = self.postings.get(token)
+                if matches is None:
+                    continue
+                matches.pop(match_id, None)
+                if not matches:
+                    del self.postings[token]
+                    del self.tokens[bisect.bisect_left(self.tokens, token)]
+                    for gram in self.grams(token):
+                        tokens = self.trigrams.get(gram)
+                        if tokens is not None:
+                            tokens.discard(token)
+                            if not tokens:
+                                del self.trigrams[gram]
+    
+    def update(self, match_id, data, status=None):
+        """(Re)index one match from its snapshot data"""
+        names = {}
+        for field in self.FIELDS:
+            name = (data.get(field) or '').strip()
+            if name and not PLACEHOLDER_PLAYER.match(name):
+                names[field] = name
+        status = status or data.get('status') or 'live'
+        
+        with self.lock:
+            doc = self.docs.get(match_id)
+            if doc is not None and doc['names'] == names:
+                doc['status'] = status
+                return
+            self._remove_match(match_id)
+            self.docs[match_id] = {'names': names, 'status': status}
+            for field, name in names.items():
+                for token in self.tokenize(name):
+                    self._add_token(token, match_id, field)
+    
+    def set_status(self, match_id, status):
+        with self.lock:
+            if match_id in self.docs:
+                self.docs[match_id]['status'] = status
+    
+    def remove(self, match_id):
+        with self.lock:
+            self._remove_match(match_id)
+    
+    def _lookup(self, term):
+        """{token: score} for one query term: exact 3, prefix 2, fuzzy 1"""
+        found = {}
+        start = bisect.bisect_left(self.tokens, term)
+        for token in self.tokens[start:start + 200]:
+            if not token.startswith(term):
+                break
+            found[token] = 3 if token == term else 2
+        if found or len(term) < 3:
+            return found
+        
+        limit = 1 if len(term) <= 5 else 2
+        grams = self.grams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigrams.get(gram, ()))
+        # Each edit breaks at most three trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        for token, count in shared.items():
+            if count >= needed and edit_distance(term, token, limit) <= limit:
+                found[token] = 1
+        return found
+    
+    def search(self, query, limit=20):
+        """Matches containing every query term, best matches first"""
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+        
+        with self.lock:
+            scores = None
+            lookups = []
+            for term in terms:
+                found = self._lookup(term)
+                lookups.append(found)
+                term_scores = {}
+                for token, score in found.items():
+                    for match_id in self.postings[token]:
+                        if score > term_scores.get(match_id, 0):
+                            term_scores[match_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {m: scores[m] + score for m, score in term_scores.items() if m in scores}
+                if not scores:
+                    return []
+            
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.docs[item[0]]['status'] != 'live', item[0]))
+            results = []
+            for match_id, score in ranked:
+                matched = set()
+                for found in lookups:
+                    for token in found:
+                        matched.update(self.postings[token].get(match_id, ()))
+                results.append({
+                    "match_id": match_id,
+                    "status": self.docs[match_id]['status'],
+                    "score": score,
+                    "matched": sorted(matched),
+                    **self.docs[match_id]['names'],
+                })
+            return results
+    
+    def describe(self):
+        with self.lock:
+            return {"matches": len(self.docs), "tokens": len(self.tokens)}
+
+class PlayerStats:
+    """Rolling batting aggregates per player, across innings and matches
+    
+    Each snapshot adds only what changed since the previous one: the runs
+    and balls a batter gained in this innings. Batters are tracked by name,
+    so swapping between the batterone/battertwo slots does not matter, and
+    innings are told apart by the match innings number parsed from the
+    title. Aggregates are written through to the SnapshotStore and reloaded
+    at boot. Reads are a dict lookup plus a fixed-size recent-form window.
+    """
+    
+    SLOTS = (
+        ('batterone', 'batsmanonerun', 'batsmanoneball'),
+        ('battertwo', 'batsmantworun', 'batsmantwoball'),
+    )
+    
+    def __init__(self, store=None, form_innings=5, max_players=10000):
+        self.store = store
+        self.form_innings = form_innings
+        self.max_players = max_players
+        self.lock = threading.Lock()
+        self.players = OrderedDict()  # key -> aggregate, least recently updated first
+        self.open = {}  # match_id -> {key: innings dict} for batters currently at the crease
+    
+    @staticmethod
+    def key(name):
+        return ' '.join(re.findall(r'[a-z0-9]+', name.lower()))
+    
+    def load(self):
+        """Reload aggregates persisted by a previous run"""
+        if self.store is None:
+            return
+        with self.lock:
+            for key, record in self.store.load_players()[-self.max_players:]:
+                for innings in record['recent']:
+                    innings['live'] = False
+                record['recent'] = deque(record['recent'], maxlen=self.form_innings)
+                self.players[key] = record
+    
+    def feed(self, match_id, data):
+        """Fold one snapshot of a match into the aggregates"""
+        match_innings_no = match_innings(data)
+        if not match_innings_no:
+            return
+        
+        batting = {}
+        for name_field, runs_field, balls_field in self.SLOTS:
+            name = (data.get(name_field) or '').strip()
+            if name and not PLACEHOLDER_PLAYER.match(name):
+                batting[self.key(name)] = (name, to_int(data.get(runs_field)), to_int(data.get(balls_field)))
+        
+        updated = []
+        evicted = []
+        with self.lock:
+            for innings in self.open.pop(match_id, {}).values():
+                innings['live'] = False
+            at_crease = self.open[match_id] = {}
+            
+            for key, (name, runs, balls) in batting.items():
+                player = self.players.get(key)
+                if player is None:
+                    player = self.players[key] = {
+                        'name': name, 'innings': 0, 'runs': 0, 'balls': 0, 'highest': 0,
+                        'recent': deque(maxlen=self.form_innings), 'updated_at': None,
+                    }
+                    if len(self.players) > self.max_players:
+                        evicted.append(self._evict_oldest())
+                self.players.move_to_end(key)
+                
+                innings = next((i for i in player['recent']
+                                if i['match_id'] == match_id and i['match_innings'] == match_innings_no), None)
+                if innings is None:
+                    innings = {'match_id': match_id, 'match_innings': match_innings_no, 'runs': 0, 'balls': 0}
+                    player['innings'] += 1
+                    player['recent'].appendleft(innings)
+                at_crease[key] = innings
+                innings['live'] = True
+                
+                if (balls, runs) <= (innings['balls'], innings['runs']):
+                    # Nothing new, or an older page than one already counted
+                    continue
+                player['runs'] += runs - innings['runs']
+                player['balls'] += balls - innings['balls']
+                player['highest'] = max(player['highest'], runs)
+                player['updated_at'] = data.get('timestamp')
+                innings.update(runs=runs, balls=balls)
+                updated.append((key, self._record(player)))
+        
+        if self.store is not None:
+            for key in evicted:
+                self.store.forget_player(key)
+            for key, record in updated:
+                self.store.save_player(key, record)
+    
+    def _evict_oldest(self):
+        # Caller holds self.lock
+        key, _ = self.players.popitem(last=False)
+        for at_crease in self.open.values():
+            at_crease.pop(key, None)
+        return key
+    
+    @staticmethod
+    def _record(player):
+        # Caller holds self.lock; the persisted form of an aggregate
+        record = dict(player)
+        record['recent'] = [{k: v for k, v in innings.items() if k != 'live'} for innings in player['recent']]
+        return record
+    
+    def close_match(self, match_id):
+        """Mark a match's batters as no longer batting (their runs stay in the totals)"""
+        with self.lock:
+            for innings in self.open.pop(match_id, {}).values():
+                innings['live'] = False
+    
+    @staticmethod
+    def strike_rate(runs, balls):
+        return round(runs / balls * 100, 2) if balls else 0.0
+    
+    def get(self, name):
+        with self.lock:
+            player = self.players.get(self.key(name))
+            if player is None:
+                return None
+            recent = [dict(innings) for innings in player['recent']]
+            totals = {field: player[field] for field in ('name', 'innings', 'runs', 'balls', 'highest', 'updated_at')}
+        
+        for innings in recent:
+            innings['strike_rate'] = self.strike_rate(innings['runs'], innings['balls'])
+        form_runs = sum(innings['runs'] for innings in recent)
+        form_balls = sum(innings['balls'] for innings in recent)
+        return {
+            **totals,
+            'strike_rate': self.strike_rate(totals['runs'], totals['balls']),
+            'runs_per_innings': round(totals['runs'] / totals['innings'], 2) if totals['innings'] else 0.0,
+            'form': {
+                'innings': len(recent),
+                'runs': form_runs,
+                'balls': form_balls,
+                'strike_rate': self.strike_rate(form_runs, form_balls),
+                'runs_per_innings': round(form_runs / len(recent), 2) if recent else 0.0,
+            },
+            'recent': recent,
+        }
+    
+    def describe(self):
+        with self.lock:
+            return {"players": len(self.players), "open_matches": len(self.open)}
+
+class MatchRegistry:
+    """Keep per-match state inside a count and memory budget
+    
+    Reads are recorded in LRU order. sweep() (run by the poller) demotes
+    finished matches to a compact cold summary that is no longer polled,
+    evicts matches nobody has read for MATCH_IDLE_SECONDS, and then evicts
+    least-recently-read matches until both MAX_MATCHES and MAX_MATCH_BYTES
+    hold. The current match is never evicted.
+    """
+    
+    def __init__(self, max_matches, max_bytes, idle_seconds):
+        self.max_matches = max_matches
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.last_read = OrderedDict()  # match_id -> monotonic time, oldest first
+        self.cold = set()
+        self.stats = {'evictions': 0, 'demotions': 0}
+        self.estimated_bytes = 0
+        self.lock = threading.Lock()
+    
+    def touch(self, match_id):
+        with self.lock:
+            self.last_read[match_id] = time.monotonic()
+            self.last_read.move_to_end(match_id)
+    
+    def register(self, match_id):
+        """Start the idle clock for a newly seen match"""
+        with self.lock:
+            if match_id not in self.last_read:
+                self.last_read[match_id] = time.monotonic()
+    
+    def match_bytes(self, match_id):
+        """Rough resident size of one match's snapshot, patches and events"""
+        snapshot = SNAPSHOTS.get(match_id)
+        size = len(snapshot.body) * 2 if snapshot else 0  # bytes + parsed dict
+        if snapshot:
+            size += sum(len(body) for body in list(snapshot.views.values()))
+        for _, ops in list(MATCH_PATCHES.get(match_id, ())):
+            size += 64 + sum(len(op['path']) + len(str(op.get('value', ''))) for op in ops)
+        detector = MATCH_EVENTS.get(match_id)
+        if detector is not None:
+            size += 256 * len(detector.events)
+        return size
+    
+    def sweep(self):
+        current_id = match_id_for_url(CURRENT_MATCH_URL) if CURRENT_MATCH_URL else None
         
-        return data
+        for match_id, snapshot in list(SNAPSHOTS.items()):
+            if snapshot.data.get('status') == 'finished':
+                # Already a cold summary (e.g. restored from disk)
+                with self.lock:
+                    self.cold.add(match_id)
+            elif match_id != current_id and is_finished(snapshot.data):
+                self.demote(match_id)
+            else:
+                with self.lock:
+                    self.cold.discard(match_id)
+        
+        now = time.monotonic()
+        with self.lock:
+            known = set(SNAPSHOTS) | set(TRACKED_MATCHES)
+            for match_id in known - set(self.last_read):
+                self.last_read[match_id] = now
+            for match_id in list(self.last_read):
+                if match_id not in known:
+                    del self.last_read[match_id]
+            candidates = [match_id for match_id in self.last_read if match_id != current_id]
+            idle = [match_id for match_id in candidates if now - self.last_read[match_id] > self.idle_seconds]
+        
+        for match_id in idle:
+            self.evict(match_id)
+        candidates = [match_id for match_id in candidates if match_id not in idle]
+        
+        sizes = {match_id: self.match_bytes(match_id) for match_id in known}
+        total = sum(sizes.values())
+        count = len(known) - len(idle)
+        # candidates are in least-recently-read order
+        for match_id in candidates:
+            if count <= self.max_matches and total <= self.max_bytes:
+                break
+            self.evict(match_id)
+            total -= sizes.get(match_id, 0)
+            count -= 1
+        self.estimated_bytes = total
     
-    def overs_to_decimal(self, overs):
-        """Convert overs like '4.3' to decimal 4.5"""
+    def demote(self, match_id):
+        """Replace a finished match with a compact summary and stop polling it"""
+        with PUBLISH_LOCK:
+            snapshot = SNAPSHOTS.get(match_id)
+            if snapshot is None:
+                return
+            summary = {key: snapshot.data[key] for key in COLD_FIELDS if key in snapshot.data}
+            summary['status'] = 'finished'
+            SNAPSHOTS[match_id] = Snapshot(match_id, snapshot.version, summary)
+            MATCH_PATCHES.pop(match_id, None)
+            MATCH_EVENTS.pop(match_id, None)
+            TRACKED_MATCHES.pop(match_id, None)
+        
+        with self.lock:
+            self.cold.add(match_id)
+        self.stats['demotions'] += 1
+        search_index.set_status(match_id, 'finished')
+        player_stats.close_match(match_id)
+        store.forget_match(match_id, keep_snapshot=True)
+        store.save_snapshot(match_id, summary, changed=False)
+        print(f"{Colors.CYAN}[Registry] {match_id} finished, kept as a cold summary{Colors.ENDC}")
+    
+    def evict(self, match_id):
+        """Drop a match from memory; its recorded history stays on disk for export"""
+        url = TRACKED_MATCHES.get(match_id)
+        if url:
+            scraper.forget_sources([url] + alternate_urls(url))
+        
+        with PUBLISH_LOCK:
+            SNAPSHOTS.pop(match_id, None)
+            MATCH_PATCHES.pop(match_id, None)
+            MATCH_EVENTS.pop(match_id, None)
+            MATCH_SOURCES.pop(match_id, None)
+            TRACKED_MATCHES.pop(match_id, None)
+            waiters = MATCH_WAITERS.pop(match_id, None)
+        if waiters is not None:
+            waiters.set()
+        
+        with self.lock:
+            self.last_read.pop(match_id, None)
+            self.cold.discard(match_id)
+        self.stats['evictions'] += 1
+        search_index.remove(match_id)
+        player_stats.close_match(match_id)
+        # The snapshot row goes too, or restore_state would bring the match back
+        store.forget_match(match_id, keep_history=True)
+        print(f"{Colors.CYAN}[Registry] Evicted {match_id}{Colors.ENDC}")
+    
+    def describe(self):
+        with self.lock:
+            cold = len(self.cold)
+        return {
+            "matches": len(SNAPSHOTS),
+            "hot": len(TRACKED_MATCHES),
+            "cold": cold,
+            "estimated_bytes": self.estimated_bytes,
+            "max_matches": self.max_matches,
+            "max_bytes": self.max_bytes,
+            "idle_seconds": self.idle_seconds,
+            "evictions": self.stats['evictions'],
+            "demotions": self.stats['demotions']
+        }
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over every Python thread
+    
+    A background thread snapshots sys._current_frames() every interval and
+    counts each stack, producing the collapsed-stack format read by
+    flamegraph.pl and speedscope ("thread;outer;...;inner count").
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    
+    def run(self, seconds, interval=0.01):
+        """Sample for the given time; returns collapsed stacks, or None if busy"""
+        if not self.lock.acquire(blocking=False):
+            return None
         try:
-            if '.' in overs:
-                parts = overs.split('.')
-                return int(parts[0]) + (int(parts[1]) / 6)
-            return float(overs)
-        except:
-            return 0.0
+            counts = Counter()
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(self.frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    counts[';'.join(reversed(stack))] += 1
+                time.sleep(interval)
+            return '\n'.join(f"{stack} {count}" for stack, count in counts.most_common()) + '\n'
+        finally:
+            self.lock.release()
+
+def process_rss_bytes():
+    """Resident set size of this process (Linux), or None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
 
 # HTML template for URL input page (unchanged)
 URL_INPUT_PAGE = """
@@ -672,12 +2446,23 @@ URL_INPUT_PAGE = """
         <div class="card">
             <h2>API Endpoints</h2>
             <div class="endpoints">
-                <div class="endpoint">GET /api/current-score - Get current match scores</div>
-                <div class="endpoint">GET /api/scrape?url={match_url} - Scrape specific match</div>
+                <div class="endpoint">GET /api/current-score - Get current match scores (?since={version} for changes only, ?wait=25&amp;version={version} to long-poll - at most LONG_POLL_SLOTS waiters per worker in sync mode, use SERVER_MODE=async at scale; ?fields=a,b or ?profile=compact for smaller payloads)</div>
+                <div class="endpoint">GET /api/scores?ids=a,b,c - Scores for several (or all tracked) matches</div>
+                <div class="endpoint">GET /api/stream?match={match_id} - Server-Sent Events on each new version (async mode, asgi.py)</div>
+                <div class="endpoint">GET /api/search?q={team or batter} - Find matches by team or batter name</div>
+                <div class="endpoint">GET /api/players/{name} - Batting totals and recent form across matches</div>
+                <div class="endpoint">GET /api/events/{match_id}?after={seq} - Wickets, milestones and other match events</div>
+                <div class="endpoint">GET /api/export/{ndjson|csv|columnar}?ids=a,b&amp;since={unix} - Stream recorded history (Authorization: Bearer ADMIN_TOKEN)</div>
+                <div class="endpoint">POST /api/webhooks - Push score changes to a public URL ({"url": ..., "match_id": ...}, admin token required)</div>
+                <div class="endpoint">GET /api/scrape?url={match_url} - Scrape specific match (add &full=1 for the scorecard)</div>
                 <div class="endpoint">GET /api/status - Get API status</div>
-                <div class="endpoint">POST /api/set-url - Set new match URL</div>
+                <div class="endpoint">POST /api/set-url - Set new match URL (optional "alternates" mirror list)</div>
                 <div class="endpoint">GET /live - View live scores page</div>
                 <div class="endpoint">GET /api/debug - Debug information</div>
+                <div class="endpoint">GET /healthz - Liveness check</div>
+                <div class="endpoint">GET /readyz - Readiness check (first snapshot loaded)</div>
+                <div class="endpoint">POST /api/admin/profile?seconds=N - Sampling profile as collapsed stacks (Authorization: Bearer ADMIN_TOKEN)</div>
+                <div class="endpoint">POST /api/admin/timing - Turn Server-Timing headers on or off (Authorization: Bearer ADMIN_TOKEN)</div>
             </div>
         </div>
     </div>
@@ -762,15 +2547,342 @@ URL_INPUT_PAGE = """
 </html>
 """
 
-scraper = CricketScraper()
+page_cache = PageCache(
+    os.environ.get('PAGE_CACHE_DIR', 'page_cache'),
+    ttl=float(os.environ.get('PAGE_CACHE_TTL', 10)),
+    max_bytes=int(os.environ.get('PAGE_CACHE_BYTES', 256 * 1024 * 1024)),
+)
+scraper = CricketScraper(cache=page_cache)
+EMPTY_SNAPSHOT = Snapshot(None, 0, {})
+CURRENT_SNAPSHOT = EMPTY_SNAPSHOT  # rebound on publish, never mutated
+store = SnapshotStore(os.environ.get('SNAPSHOT_DB', 'cricket_state.db'))
+profiler = SamplingProfiler()
+search_index = SearchIndex()
+player_stats = PlayerStats(store)
+registry = MatchRegistry(MAX_MATCHES, MAX_MATCH_BYTES, MATCH_IDLE_SECONDS)
+webhooks = WebhookDispatcher(workers=int(os.environ.get('WEBHOOK_WORKERS', 4)))
+
+def match_id_for_url(url):
+    """Stable id for a match URL, shared by its /live, /scorecard, ... pages"""
+    path = url.split('?')[0].split('#')[0].rstrip('/')
+    parts = [p for p in path.split('/')[3:] if p]
+    while parts and parts[-1].lower() in ('live', 'scorecard', 'info', 'commentary'):
+        parts.pop()
+    if parts:
+        return re.sub(r'[^a-z0-9-]+', '-', parts[-1].lower()).strip('-')
+    return re.sub(r'[^a-z0-9-]+', '-', path.lower()).strip('-')
+
+def alternate_urls(url):
+    """Equivalent pages for a match: its /live and /scorecard views plus mirrors"""
+    base = url.split('?')[0].rstrip('/')
+    urls = []
+    for tail in ('live', 'scorecard'):
+        if base.endswith('/' + tail):
+            stem = base[:-len(tail)]
+            urls += [stem + other for other in ('live', 'scorecard') if other != tail]
+    urls += MATCH_SOURCES.get(match_id_for_url(url), [])
+    return [u for u in dict.fromkeys(urls) if u != url]
+
+def parse_in_worker(html, full):
+    """Process-pool entry point: parse one page into a snapshot dict"""
+    return scraper.parse_page(html, full=full)
+
+def init_parse_worker(log_to_stderr):
+    # Batch mode sends log output to stderr; keep the workers' there too
+    if log_to_stderr:
+        sys.stdout = sys.stderr
+
+def parse_pool():
+    """The shared parse pool, started on first use"""
+    global PARSE_POOL
+    with PARSE_POOL_LOCK:
+        if PARSE_POOL is None:
+            # spawn, not fork: forking a process with live poll, webhook and
+            # SQLite writer threads can copy a held lock into the child
+            PARSE_POOL = ProcessPoolExecutor(
+                max_workers=PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_parse_worker,
+                initargs=(sys.stdout is sys.stderr,),
+            )
+        return PARSE_POOL
+
+def reset_parse_pool():
+    global PARSE_POOL
+    with PARSE_POOL_LOCK:
+        pool, PARSE_POOL = PARSE_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def scrape_match_url(url, full=None, mirrors=(), use_cache=True):
+    """Scrape a match using all of its known equivalent sources"""
+    if full is None:
+        full = SCORECARD_MODE == 'full'
+    alternates = alternate_urls(url)
+    alternates += [m for m in mirrors if m and m != url and m not in alternates]
+    return scraper.scrape_crex_scores(url, alternates=alternates, full=full, use_cache=use_cache)
+
+client_limiter = RateLimiter(SCRAPE_CLIENT_RATE, SCRAPE_CLIENT_BURST)
+target_limiter = RateLimiter(SCRAPE_URL_RATE, SCRAPE_URL_BURST)
+scrape_admission = ScrapeAdmission(SCRAPE_CONCURRENCY, SCRAPE_QUEUE)
+RECENT_SCRAPES = {}  # url -> (monotonic time, data)
+
+def client_ip():
+    # Each trusted proxy appends the address it saw; anything left of those
+    # hops was written by the client and can't be used as a rate-limit key
+    hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+    if TRUSTED_PROXIES and len(hops) >= TRUSTED_PROXIES:
+        return hops[-TRUSTED_PROXIES]
+    return request.remote_addr or 'unknown'
+
+def too_many_requests(message, retry_after):
+    response = jsonify({"error": message, "retry_after": math.ceil(retry_after)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+def admitted_scrape(url, full=None, mirrors=()):
+    """Scrape url on behalf of a client request, subject to admission control
+    
+    Returns (data, cached, error_response). error_response is set when the
+    request was refused; cached is True when data is a recent scrape served
+    again rather than a fresh fetch, and must not be published - a newer
+    snapshot may have been published since. data is None if the scrape failed.
+    """
+    wait = client_limiter.check(client_ip())
+    if wait:
+        return None, False, too_many_requests("Too many scrape requests from this client", wait)
+    
+    cache_key = (url, bool(full))
+    cached = RECENT_SCRAPES.get(cache_key)
+    if cached and time.monotonic() - cached[0] < SCRAPE_CACHE_TTL:
+        return cached[1], True, None
+    
+    wait = target_limiter.check(url)
+    if wait:
+        if cached:
+            # Slightly stale beats hammering the same upstream page
+            return cached[1], True, None
+        return None, False, too_many_requests("This match was scraped very recently, try again shortly", wait)
+    
+    if not scrape_admission.enter():
+        return None, False, too_many_requests("Scrape queue is full", SCRAPE_CACHE_TTL)
+    try:
+        data = scrape_match_url(url, full=full, mirrors=mirrors)
+    finally:
+        scrape_admission.leave()
+    
+    if data:
+        if len(RECENT_SCRAPES) > 1000:
+            RECENT_SCRAPES.clear()
+        RECENT_SCRAPES[cache_key] = (time.monotonic(), data)
+    return data, False, None
+
+def set_match_sources(url, mirrors):
+    """Remember extra mirror URLs for the match behind url"""
+    match_id = match_id_for_url(url)
+    MATCH_SOURCES[match_id] = [m for m in mirrors if m and m != url]
+    store.save_setting('match_sources', MATCH_SOURCES)
+
+def track_match(url):
+    """Register a match URL so it is persisted across restarts"""
+    match_id = match_id_for_url(url)
+    if TRACKED_MATCHES.get(match_id) != url:
+        TRACKED_MATCHES[match_id] = url
+        store.save_match(match_id, url)
+        registry.register(match_id)
+    return match_id
+
+def set_current_url(url):
+    """Switch the tracked match and persist the choice"""
+    global CURRENT_MATCH_URL, CURRENT_SNAPSHOT
+    
+    with PUBLISH_LOCK:
+        CURRENT_MATCH_URL = url
+        # Serve the new match's last snapshot (if any), never the old match's
+        CURRENT_SNAPSHOT = SNAPSHOTS.get(match_id_for_url(url), EMPTY_SNAPSHOT) if url else EMPTY_SNAPSHOT
+    store.save_setting('current_url', url)
+    if url:
+        track_match(url)
+
+def is_current_match(match_id):
+    return bool(CURRENT_MATCH_URL) and match_id == match_id_for_url(CURRENT_MATCH_URL)
+
+def json_pointer(key):
+    return '/' + key.replace('~', '~0').replace('/', '~1')
+
+def diff_snapshots(old, new):
+    """JSON-Patch (RFC 6902) ops turning snapshot old into new"""
+    ops = []
+    for key, value in new.items():
+        if key not in old:
+            ops.append({'op': 'add', 'path': json_pointer(key), 'value': value})
+        elif old[key] != value:
+            ops.append({'op': 'replace', 'path': json_pointer(key), 'value': value})
+    for key in old:
+        if key not in new:
+            ops.append({'op': 'remove', 'path': json_pointer(key)})
+    return ops
+
+def merge_patches(patches):
+    """Collapse consecutive patches into one op per path"""
+    merged = {}
+    for ops in patches:
+        for op in ops:
+            earlier = merged.pop(op['path'], None)
+            if earlier is None:
+                merged[op['path']] = op
+            elif earlier['op'] == 'add' and op['op'] == 'remove':
+                continue  # never existed as far as the client knows
+            elif earlier['op'] == 'add':
+                merged[op['path']] = dict(op, op='add')
+            elif earlier['op'] == 'remove' and op['op'] == 'add':
+                merged[op['path']] = dict(op, op='replace')
+            else:
+                merged[op['path']] = op
+    return list(merged.values())
+
+def next_version(match_id, previous, data):
+    """Version for data published after previous; (version, changed)
+    
+    The version only moves when content (not just the timestamp) changed.
+    Versions start from the wall clock in milliseconds so a client holding
+    a version from before a restart can never match a new one by accident.
+    """
+    if previous is None:
+        MATCH_PATCHES[match_id] = deque(maxlen=PATCH_HISTORY)
+        return int(time.time() * 1000), True
+    
+    ops = diff_snapshots(previous.data, data)
+    if not any(op['path'] != '/timestamp' for op in ops):
+        return previous.version, False
+    
+    version = previous.version + 1
+    MATCH_PATCHES.setdefault(match_id, deque(maxlen=PATCH_HISTORY)).append((version, ops))
+    return version, True
+
+def snapshot_delta(snapshot, since):
+    """Changes since a client's version, or the full snapshot if too far behind"""
+    version = snapshot.version
+    if since == version:
+        return {'version': version, 'since': since, 'patch': []}
+    
+    patches = [(v, ops) for v, ops in list(MATCH_PATCHES.get(snapshot.match_id, ())) if v <= version]
+    if since < version and patches and patches[0][0] <= since + 1:
+        return {
+            'version': version,
+            'since': since,
+            'patch': merge_patches(ops for v, ops in patches if v > since)
+        }
+    
+    return {'version': version, 'full': True, 'snapshot': snapshot.to_dict()}
+
+def publish_snapshot(url, data):
+    """Publish a freshly scraped snapshot and persist it asynchronously
+    
+    Returns the new Snapshot, or the current one when data is behind it.
+    """
+    global CURRENT_SNAPSHOT
+    
+    match_id = track_match(url)
+    with PUBLISH_LOCK:
+        previous = SNAPSHOTS.get(match_id)
+        if previous is not None and is_behind(data, previous.data):
+            # A slow mirror or an old page must not roll the live score back
+            print(f"{Colors.WARNING}[Publish] Ignoring {match_id}: scraped score is behind version {previous.version}{Colors.ENDC}")
+            return previous
+        
+        version, changed = next_version(match_id, previous, data)
+        snapshot = Snapshot(match_id, version, data)
+        SNAPSHOTS[match_id] = snapshot
+        if is_current_match(match_id):
+            CURRENT_SNAPSHOT = snapshot
+        
+        if changed:
+            # Wake long-poll waiters; the new snapshot is visible before this pop
+            waiters = MATCH_WAITERS.pop(match_id, None)
+            if waiters is not None:
+                waiters.set()
+            
+            events = event_detector(match_id).feed(snapshot.data, version=version)
+    
+    if changed:
+        for listener in PUBLISH_LISTENERS:
+            listener(match_id, snapshot)
+        search_index.update(match_id, snapshot.data)
+        player_stats.feed(match_id, snapshot.data)
+        webhooks.notify(match_id, {
+            'match_id': match_id,
+            'version': version,
+            'events': events,
+            'data': snapshot.to_dict()
+        })
+    
+    store.save_snapshot(match_id, snapshot.to_dict(), changed=changed)
+    return snapshot
+
+def wait_for_version(match_id, known_version, timeout):
+    """Block until match_id moves past known_version; False on timeout
+    
+    All waiters on a match share one Event that is replaced on every
+    version bump, so parked requests cost no CPU and no per-waiter lock.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        waiters = MATCH_WAITERS.setdefault(match_id, threading.Event())
+        # Check after grabbing the event so a publish in between isn't missed
+        if SNAPSHOTS.get(match_id, EMPTY_SNAPSHOT).version != known_version:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        waiters.wait(remaining)
+
+def event_detector(match_id):
+    if match_id not in MATCH_EVENTS:
+        MATCH_EVENTS.setdefault(match_id, EventDetector(match_id))
+    return MATCH_EVENTS[match_id]
+
+def restore_state():
+    """Reload tracked matches, settings and the latest snapshot from disk"""
+    global CURRENT_MATCH_URL, CURRENT_SNAPSHOT, AUTO_UPDATE, UPDATE_INTERVAL
+    
+    try:
+        settings, matches, snapshots = store.load()
+    except (sqlite3.Error, ValueError) as e:
+        print(f"{Colors.FAIL}[Store] Could not restore state: {str(e)}{Colors.ENDC}")
+        return
+    
+    TRACKED_MATCHES.update(matches)
+    MATCH_SOURCES.update(settings.get('match_sources', {}))
+    for subscription in settings.get('webhooks', []):
+        webhooks.subscribe(subscription['match_id'], subscription['url'], sub_id=subscription['id'])
+    CURRENT_MATCH_URL = settings.get('current_url', CURRENT_MATCH_URL)
+    AUTO_UPDATE = settings.get('auto_update', AUTO_UPDATE)
+    UPDATE_INTERVAL = settings.get('update_interval', UPDATE_INTERVAL)
+    
+    player_stats.load()
+    with PUBLISH_LOCK:
+        for match_id, data in snapshots.items():
+            version, _ = next_version(match_id, None, data)
+            SNAPSHOTS[match_id] = Snapshot(match_id, version, data)
+            event_detector(match_id).feed(data, emit=False)
+            search_index.update(match_id, data)
+            player_stats.feed(match_id, data)
+        
+        if CURRENT_MATCH_URL:
+            CURRENT_SNAPSHOT = SNAPSHOTS.get(match_id_for_url(CURRENT_MATCH_URL), EMPTY_SNAPSHOT)
+    
+    if matches:
+        print(f"{Colors.GREEN}[Store] Restored {len(matches)} tracked match(es){Colors.ENDC}")
 
 @app.route('/')
 def home():
-    global CURRENT_MATCH_URL, MATCH_DATA, AUTO_UPDATE
+    global CURRENT_MATCH_URL, AUTO_UPDATE
     return render_template_string(
         URL_INPUT_PAGE, 
         current_url=CURRENT_MATCH_URL,
-        match_data=MATCH_DATA,
+        match_data=CURRENT_SNAPSHOT.data,
         auto_update=AUTO_UPDATE
     )
 
@@ -823,20 +2935,25 @@ def live_scores():
 
 @app.route('/api/set-url', methods=['POST'])
 def set_url():
-    global CURRENT_MATCH_URL, MATCH_DATA
-    
     data = request.json
     url = data.get('url')
     
     if not url:
         return jsonify({"error": "URL is required"}), 400
     
-    CURRENT_MATCH_URL = url
+    # Do initial scrape; a refused request must not switch the tracked match
+    mirrors = data.get('alternates') or []
+    scraped_data, cached, error = admitted_scrape(url, mirrors=mirrors)
+    if error is not None:
+        return error
+    
+    set_current_url(url)
+    if 'alternates' in data:
+        set_match_sources(url, mirrors)
     
-    # Do initial scrape
-    scraped_data = scraper.scrape_crex_scores(url)
     if scraped_data:
-        MATCH_DATA = scraped_data
+        if not cached:
+            publish_snapshot(url, scraped_data)
         print_match_update(scraped_data)
         return jsonify({
             "message": "URL set successfully", 
@@ -846,9 +2963,37 @@ def set_url():
     
     return jsonify({"error": "Failed to scrape initial data"}), 500
 
+def requested_view(args=None):
+    """(profile, fields) from ?profile= and ?fields=, or raise ValueError"""
+    if args is None:
+        args = request.args
+    profile = args.get('profile', 'full')
+    if profile not in PAYLOAD_PROFILES:
+        raise ValueError(f"Unknown profile '{profile}' (expected one of: {', '.join(PAYLOAD_PROFILES)})")
+    fields = tuple(sorted({f.strip() for f in args.get('fields', '').split(',') if f.strip()})) or None
+    return profile, fields
+
+def project_delta(delta, fields):
+    """Restrict a snapshot_delta() result to the projected fields"""
+    if not fields:
+        return delta
+    if 'patch' in delta:
+        delta['patch'] = [op for op in delta['patch'] if op['path'].split('/')[1] in fields]
+    else:
+        delta['snapshot'] = {name: value for name, value in delta['snapshot'].items() if name in fields}
+    return delta
+
 @app.route('/api/current-score')
 def get_current_score():
-    global CURRENT_MATCH_URL, MATCH_DATA
+    """Current match snapshot; ?since= deltas, ?wait=&version= long-polls
+    
+    Under gunicorn gthread (SERVER_MODE=sync) a parked long-poll holds a
+    worker thread, so only LONG_POLL_SLOTS of them wait per worker; beyond
+    that the request gets 204 with Retry-After at once and the client ends
+    up polling every few seconds. Thousands of idle waiters need
+    SERVER_MODE=async (asgi.py), where a waiter is a coroutine.
+    """
+    global CURRENT_MATCH_URL
     
     response_headers = {
         'Content-Type': 'application/json',
@@ -860,76 +3005,385 @@ def get_current_score():
     if not CURRENT_MATCH_URL:
         return jsonify({"error": "No match URL set. Please visit the home page to set a URL."}), 400, response_headers
     
-    # Check if MATCH_DATA has actual data (not just empty dict)
-    if MATCH_DATA and any(MATCH_DATA.values()):
-        return jsonify(MATCH_DATA), 200, response_headers
-    else:
+    since = request.args.get('since', type=int)
+    try:
+        profile, fields = requested_view()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400, response_headers
+    if since is not None and profile != 'full':
+        return jsonify({"error": "?since= deltas are only available for the full profile"}), 400, response_headers
+    
+    # One reference read; everything below comes from this snapshot
+    snapshot = CURRENT_SNAPSHOT
+    if snapshot.match_id:
+        registry.touch(snapshot.match_id)
+    
+    # Check if the snapshot has actual data (not just an empty dict)
+    if not (snapshot and any(snapshot.data.values())):
         # If no data yet, trigger a scrape
         print(f"{Colors.CYAN}No data available, triggering scrape...{Colors.ENDC}")
-        data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
-        if data:
-            MATCH_DATA = data
-            return jsonify(MATCH_DATA), 200, response_headers
-        else:
+        match_url = CURRENT_MATCH_URL
+        # Same limits as /api/scrape, so cold reads can't fan out to upstream
+        data, cached, error = admitted_scrape(match_url)
+        if error is not None:
+            return error
+        if not data:
+            response_headers['Retry-After'] = str(UPDATE_INTERVAL)
             return jsonify({"error": "No data available yet. Please wait for the first update."}), 503, response_headers
+        snapshot = SNAPSHOTS.get(match_id_for_url(match_url)) if cached else None
+        if snapshot is None:
+            snapshot = publish_snapshot(match_url, data)
+    
+    response_headers['Access-Control-Expose-Headers'] = 'X-Snapshot-Version'
+    
+    # Long-poll mode: hold the request until a version newer than ?version=
+    wait_seconds = min(request.args.get('wait', default=0, type=float), LONG_POLL_MAX)
+    known_version = request.args.get('version', type=int)
+    if wait_seconds > 0 and known_version is not None and snapshot.version == known_version:
+        # Each parked request holds a worker thread, so only a few may wait at once
+        if not LONG_POLL_SLOTS.acquire(blocking=False):
+            response_headers['X-Snapshot-Version'] = str(known_version)
+            response_headers['Retry-After'] = str(math.ceil(min(wait_seconds, 5)))
+            return '', 204, response_headers
+        try:
+            updated = wait_for_version(snapshot.match_id, known_version, wait_seconds)
+        finally:
+            LONG_POLL_SLOTS.release()
+        if not updated:
+            response_headers['X-Snapshot-Version'] = str(known_version)
+            return '', 204, response_headers
+        snapshot = SNAPSHOTS.get(snapshot.match_id, snapshot)
+    
+    response_headers['X-Snapshot-Version'] = str(snapshot.version)
+    
+    if since is not None:
+        # Delta mode: only the fields changed since the client's version
+        return jsonify(project_delta(snapshot_delta(snapshot, since), fields)), 200, response_headers
+    
+    # Serialized once per version and profile
+    return snapshot.view(profile, fields), 200, response_headers
 
 @app.route('/api/scrape')
 def scrape_match():
     """Scrape match data from URL parameter or current URL"""
-    global CURRENT_MATCH_URL, MATCH_DATA
+    global CURRENT_MATCH_URL
     
     match_url = request.args.get('url') or CURRENT_MATCH_URL
+    full = request.args.get('full', '').lower() in ('1', 'true', 'yes') or None
     
     if not match_url:
         return jsonify({"error": "No match URL provided or set"}), 400
     
-    data = scraper.scrape_crex_scores(match_url)
+    data, cached, error = admitted_scrape(match_url, full=full)
+    if error is not None:
+        return error
     
     if data:
-        MATCH_DATA = data
+        # Re-served scrapes were published when fetched; publishing them again could roll back
+        registry.touch(match_id_for_url(match_url) if cached else publish_snapshot(match_url, data).match_id)
         print_match_update(data)
         return jsonify(data)
     
     return jsonify({"error": "Unable to scrape match data"}), 500
 
+def combined_scores(ids_param, profile='full', fields=None):
+    """(etag, body) for /api/scores, stitched from each match's cached bytes"""
+    if ids_param:
+        match_ids = [i.strip() for i in ids_param.split(',') if i.strip()]
+    else:
+        match_ids = sorted(SNAPSHOTS)
+    
+    parts = []
+    etags = []
+    missing = []
+    for match_id in match_ids:
+        snapshot = SNAPSHOTS.get(match_id)
+        if snapshot is None:
+            missing.append(match_id)
+            continue
+        registry.touch(match_id)
+        parts.append(json.dumps(match_id).encode('utf-8') + b':' + snapshot.view(profile, fields))
+        etags.append(snapshot.etag)
+    
+    combined_etag = hashlib.blake2b(
+        '|'.join([profile, ','.join(fields or ())] + match_ids + etags).encode('utf-8'), digest_size=8
+    ).hexdigest()
+    body = b''.join([
+        b'{"matches":{', b','.join(parts),
+        b'},"missing":', encode_json(missing), b'}'
+    ])
+    return combined_etag, body
+
+@app.route('/api/scores')
+def get_scores():
+    """Snapshots for several matches in one response
+    
+    ?ids=a,b,c selects matches; without it every tracked match is returned.
+    ?profile= and ?fields= work as on /api/current-score.
+    """
+    try:
+        profile, fields = requested_view()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    combined_etag, body = combined_scores(request.args.get('ids', ''), profile, fields)
+    headers = {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache',
+        'ETag': f'"{combined_etag}"'
+    }
+    
+    if request.if_none_match.contains(combined_etag):
+        return '', 304, headers
+    return body, 200, headers
+
+@app.route('/api/export/<fmt>')
+def export_history(fmt):
+    """Stream recorded history as NDJSON, CSV or columnar binary
+    
+    ?ids=a,b limits the matches, ?since= and ?until= (unix seconds) the time
+    range. Rows are read and written a batch at a time, so memory does not
+    grow with the size of the export. Each export scans SQLite and holds a
+    worker for the whole stream, so it needs the admin token.
+    """
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown format '{fmt}' (expected one of: {', '.join(EXPORT_FORMATS)})"}), 400
+    if not store.enabled:
+        return jsonify({"error": "History is not being recorded (SNAPSHOT_DB is unset)"}), 503
+    
+    ids = [i.strip() for i in request.args.get('ids', '').split(',') if i.strip()]
+    batches = store.iter_history(
+        match_ids=ids or None,
+        since=request.args.get('since', type=float),
+        until=request.args.get('until', type=float),
+    )
+    generator, mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"history-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    # No Content-Length, so the WSGI server sends it chunked
+    return Response(generator(batches), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+    })
+
+@app.route('/api/search')
+def search_matches():
+    """Find live and finished matches by team or batter name (prefix and fuzzy)"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing ?q= search text"}), 400
+    limit = min(max(request.args.get('limit', default=20, type=int), 1), 100)
+    
+    started = time.perf_counter()
+    results = search_index.search(query, limit=limit)
+    return jsonify({
+        "query": query,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3)
+    })
+
+@app.route('/api/players/<path:name>')
+def get_player(name):
+    """Rolling batting totals and recent form for one player"""
+    stats = player_stats.get(name.replace('-', ' '))
+    if stats is None:
+        return jsonify({"error": f"No batting data for: {name}"}), 404
+    return jsonify(stats)
+
+@app.route('/api/events/<match_id>')
+def get_events(match_id):
+    """Events detected for a match; ?after=<seq> returns only newer ones"""
+    if match_id == 'current' and CURRENT_MATCH_URL:
+        match_id = match_id_for_url(CURRENT_MATCH_URL)
+    
+    detector = MATCH_EVENTS.get(match_id)
+    if detector is None:
+        return jsonify({"error": f"Unknown match: {match_id}"}), 404
+    registry.touch(match_id)
+    
+    after = request.args.get('after', default=0, type=int)
+    return jsonify({
+        "match_id": match_id,
+        "last_seq": detector.seq,
+        "events": detector.since(after)
+    })
+
+def save_webhooks():
+    store.save_setting('webhooks', [
+        {key: sub[key] for key in ('id', 'match_id', 'url')} for sub in webhooks.describe()
+    ])
+
+@app.route('/api/webhooks', methods=['GET', 'POST'])
+def manage_webhooks():
+    """List webhook subscriptions, or subscribe a URL to a match's updates"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    if request.method == 'GET':
+        return jsonify({"subscriptions": webhooks.describe(), "stats": webhooks.stats})
+    
+    data = request.json or {}
+    url = data.get('url', '')
+    match_id = data.get('match_id') or (match_id_for_url(CURRENT_MATCH_URL) if CURRENT_MATCH_URL else None)
+    
+    error = webhook_target_error(url)
+    if error:
+        return jsonify({"error": error}), 400
+    if not match_id:
+        return jsonify({"error": "match_id is required when no match is being tracked"}), 400
+    
+    subscription = webhooks.subscribe(match_id, url)
+    save_webhooks()
+    return jsonify(subscription), 201
+
+@app.route('/api/webhooks/<sub_id>', methods=['DELETE'])
+def delete_webhook(sub_id):
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    if webhooks.unsubscribe(sub_id) is None:
+        return jsonify({"error": "Unknown subscription"}), 404
+    save_webhooks()
+    return jsonify({"deleted": sub_id})
+
+@app.route('/api/webhooks/dead-letters')
+def webhook_dead_letters():
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    return jsonify({"dead_letters": list(webhooks.dead_letters)})
+
 @app.route('/api/status')
 def get_status():
-    global CURRENT_MATCH_URL, AUTO_UPDATE, MATCH_DATA
+    global CURRENT_MATCH_URL, AUTO_UPDATE
+    snapshot = CURRENT_SNAPSHOT
     return jsonify({
         "current_url": CURRENT_MATCH_URL,
         "auto_update": AUTO_UPDATE,
         "update_interval": UPDATE_INTERVAL,
-        "has_data": bool(MATCH_DATA),
-        "last_update": MATCH_DATA.get('timestamp') if MATCH_DATA else None
+        "tracked_matches": TRACKED_MATCHES,
+        "scorecard_mode": SCORECARD_MODE,
+        "html_parser": HTML_PARSER,
+        "parse_processes": PARSE_PROCESSES,
+        "page_cache": page_cache.describe(),
+        "has_data": bool(snapshot),
+        "version": snapshot.version,
+        "last_update": snapshot.data.get('timestamp') if snapshot else None,
+        "registry": registry.describe(),
+        "search_index": search_index.describe(),
+        "player_stats": player_stats.describe(),
+        "memory": {"rss_bytes": process_rss_bytes()},
+        "scrape_admission": {
+            "in_flight_or_queued": scrape_admission.admitted,
+            "rejected": scrape_admission.rejected
+        },
+        "sources": {
+            url: {
+                "samples": len(stats.samples),
+                "failures": stats.failures,
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95)
+            }
+            for url, stats in scraper.sources()
+        }
     })
 
 @app.route('/api/debug')
 def debug_info():
     """Debug endpoint to check current state"""
-    global CURRENT_MATCH_URL, MATCH_DATA
+    global CURRENT_MATCH_URL
+    # Every field below comes from the same published snapshot
+    snapshot = CURRENT_SNAPSHOT
+    data = snapshot.data
     return jsonify({
         "current_url": CURRENT_MATCH_URL,
-        "has_match_data": bool(MATCH_DATA),
-        "match_data_keys": list(MATCH_DATA.keys()) if MATCH_DATA else [],
+        "has_match_data": bool(data),
+        "version": snapshot.version,
+        "match_data_keys": list(data.keys()) if data else [],
         "match_data_sample": {
-            "team1_name": MATCH_DATA.get('team1_name', 'N/A'),
-            "team1_score": MATCH_DATA.get('team1_score', 'N/A'),
-            "team1_overs": MATCH_DATA.get('team1_overs', 'N/A'),
-            "team2_name": MATCH_DATA.get('team2_name', 'N/A'),
-            "team2_score": MATCH_DATA.get('team2_score', 'N/A'),
-            "team2_overs": MATCH_DATA.get('team2_overs', 'N/A'),
-            "livescore": MATCH_DATA.get('livescore', 'N/A'),
-            "batterone": MATCH_DATA.get('batterone', 'N/A'),
-            "batsmanonerun": MATCH_DATA.get('batsmanonerun', 'N/A'),
-            "battertwo": MATCH_DATA.get('battertwo', 'N/A'),
-            "batsmantworun": MATCH_DATA.get('batsmantworun', 'N/A')
-        } if MATCH_DATA else {}
+            "team1_name": data.get('team1_name', 'N/A'),
+            "team1_score": data.get('team1_score', 'N/A'),
+            "team1_overs": data.get('team1_overs', 'N/A'),
+            "team2_name": data.get('team2_name', 'N/A'),
+            "team2_score": data.get('team2_score', 'N/A'),
+            "team2_overs": data.get('team2_overs', 'N/A'),
+            "livescore": data.get('livescore', 'N/A'),
+            "batterone": data.get('batterone', 'N/A'),
+            "batsmanonerun": data.get('batsmanonerun', 'N/A'),
+            "battertwo": data.get('battertwo', 'N/A'),
+            "batsmantworun": data.get('batsmantworun', 'N/A')
+        } if data else {}
+    })
+
+def is_admin_request():
+    """Admin endpoints need ADMIN_TOKEN as an Authorization: Bearer token
+    
+    Never taken from the query string, which ends up in access logs and
+    browser history.
+    """
+    token = os.environ.get('ADMIN_TOKEN', '')
+    if not token:
+        return False
+    scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not supplied.strip():
+        return False
+    return hmac.compare_digest(supplied.strip().encode('utf-8'), token.encode('utf-8'))
+
+@app.route('/api/admin/timing', methods=['GET', 'POST'])
+def admin_timing():
+    """Show or set whether responses carry Server-Timing headers"""
+    global TIMING_ENABLED
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        TIMING_ENABLED = bool(data.get('enabled', not TIMING_ENABLED))
+    return jsonify({"server_timing": TIMING_ENABLED})
+
+@app.route('/api/admin/profile', methods=['POST'])
+def admin_profile():
+    """Profile the whole process for ?seconds=N and return collapsed stacks"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    
+    seconds = min(max(request.args.get('seconds', default=10, type=float), 0.1), 60)
+    interval = min(max(request.args.get('interval', default=10, type=float), 1), 1000) / 1000
+    
+    collapsed = profiler.run(seconds, interval)
+    if collapsed is None:
+        return jsonify({"error": "A profile is already running"}), 409
+    
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return Response(collapsed, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
     })
 
+@app.route('/healthz')
+def healthz():
+    """Liveness probe - answers as soon as the worker can serve requests"""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe - ready once the first snapshot is loaded"""
+    snapshot = CURRENT_SNAPSHOT
+    if snapshot:
+        return jsonify({"status": "ready", "last_update": snapshot.data.get('timestamp')})
+    
+    if WARMUP_DONE.is_set() and not CURRENT_MATCH_URL:
+        # Nothing to load until a URL is set via the web interface
+        return jsonify({"status": "ready", "last_update": None})
+    
+    return jsonify({
+        "status": "warming up" if not WARMUP_DONE.is_set() else "waiting for first snapshot",
+        "current_url": CURRENT_MATCH_URL
+    }), 503
+
 @app.route('/api/toggle-auto-update', methods=['POST'])
 def toggle_auto_update():
     global AUTO_UPDATE
     AUTO_UPDATE = not AUTO_UPDATE
+    store.save_setting('auto_update', AUTO_UPDATE)
     print(f"\n{Colors.CYAN}Auto-update {'enabled' if AUTO_UPDATE else 'disabled'}{Colors.ENDC}")
     return jsonify({"auto_update": AUTO_UPDATE})
 
@@ -1064,23 +3518,222 @@ def print_match_update(data):
 
 def auto_update_scores():
     """Background thread to auto-update scores"""
-    global CURRENT_MATCH_URL, MATCH_DATA, AUTO_UPDATE, UPDATE_INTERVAL
+    global CURRENT_MATCH_URL, AUTO_UPDATE, UPDATE_INTERVAL
+    
+    pool = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix='poll')
     
     while True:
         time.sleep(UPDATE_INTERVAL)
         
         if AUTO_UPDATE and CURRENT_MATCH_URL:
             print(f"{Colors.CYAN}[Auto-Update] Fetching latest scores...{Colors.ENDC}")
-            data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
+        
+        registry.sweep()
+        
+        if AUTO_UPDATE:
+            urls = dict(TRACKED_MATCHES)
+            if CURRENT_MATCH_URL:
+                urls[match_id_for_url(CURRENT_MATCH_URL)] = CURRENT_MATCH_URL
+            # list() waits for the whole round before sleeping again
+            list(pool.map(update_match, urls.values()))
+
+def update_match(url):
+    """Scrape and publish one tracked match"""
+    data = scrape_match_url(url, use_cache=False)
+    current = is_current_match(match_id_for_url(url))
+    if data:
+        publish_snapshot(url, data)
+        if current:
+            print_match_update(data)
+    elif current:
+        print(f"{Colors.FAIL}[Auto-Update] Failed to fetch scores{Colors.ENDC}")
+    else:
+        print(f"{Colors.FAIL}[Auto-Update] Failed to fetch {url}{Colors.ENDC}")
+
+def is_production():
+    """True when running on Render or another production platform"""
+    return os.environ.get('RENDER') == 'true' or os.environ.get('PRODUCTION') == 'true'
+
+def warmup():
+    """Load heavy modules and the first snapshot off the request path"""
+    try:
+        import requests  # noqa: F401
+        from bs4 import BeautifulSoup  # noqa: F401
+        
+        # Set default URL from environment variable if available
+        default_url = os.environ.get('DEFAULT_MATCH_URL', '')
+        if default_url and not CURRENT_MATCH_URL:
+            set_current_url(default_url)
+            print(f"{Colors.CYAN}Using default match URL from environment{Colors.ENDC}")
+        
+        if CURRENT_MATCH_URL and not CURRENT_SNAPSHOT:
+            data = scrape_match_url(CURRENT_MATCH_URL, use_cache=False)
             if data:
-                MATCH_DATA = data
-                print_match_update(data)
+                publish_snapshot(CURRENT_MATCH_URL, data)
+                print(f"{Colors.GREEN}Initial data loaded successfully{Colors.ENDC}")
             else:
-                print(f"{Colors.FAIL}[Auto-Update] Failed to fetch scores{Colors.ENDC}")
+                print(f"{Colors.WARNING}Initial scrape failed, waiting for auto-update{Colors.ENDC}")
+    finally:
+        WARMUP_DONE.set()
+
+def start_background_tasks(warm=True):
+    """Start the auto-update thread (and warmup) once per process"""
+    global BACKGROUND_STARTED
+    
+    with BACKGROUND_LOCK:
+        if BACKGROUND_STARTED:
+            return
+        BACKGROUND_STARTED = True
+    
+    # Serve the last known snapshot right away, then refresh it
+    store.open()
+    restore_state()
+    
+    update_thread = threading.Thread(target=auto_update_scores, daemon=True)
+    update_thread.start()
+    
+    if warm:
+        threading.Thread(target=warmup, daemon=True).start()
+    else:
+        WARMUP_DONE.set()
+
+def read_url_file(path):
+    """Match URLs from a file (or - for stdin), skipping blanks and # comments"""
+    handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith('#')]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def run_batch(argv):
+    """Headless batch scrape: python app.py batch urls.txt [-o out.ndjson]
+    
+    Scrapes every URL with a worker pool under a shared rate limit and writes
+    one JSON object per line as each scrape finishes (completion order, with
+    the input line index). Log output goes to stderr so stdout stays NDJSON.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='app.py batch', description='Scrape a list of match URLs to NDJSON')
+    parser.add_argument('urls', help='file with one match URL per line (- for stdin)')
+    parser.add_argument('-o', '--output', default='-', help='NDJSON output file (default: stdout)')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='parallel scrapes (default: 4)')
+    parser.add_argument('-r', '--rate', type=float, default=2.0, help='max scrapes started per second (default: 2)')
+    parser.add_argument('--full', action='store_true', help='include the full scorecard')
+    args = parser.parse_args(argv)
+    
+    urls = read_url_file(args.urls)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    bucket = TokenBucket(args.rate, max(1, args.workers)) if args.rate > 0 else None
+    bucket_lock = threading.Lock()
+    write_lock = threading.Lock()
+    
+    def throttle():
+        if bucket is None:
+            return
+        while True:
+            with bucket_lock:
+                delay = bucket.take()
+            if not delay:
+                return
+            time.sleep(delay)
+    
+    def scrape(index, url):
+        throttle()
+        started = time.monotonic()
+        data = scraper.scrape_crex_scores(url, full=args.full)
+        record = {
+            "index": index,
+            "url": url,
+            "match_id": match_id_for_url(url),
+            "ok": data is not None,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        if data is None:
+            record["error"] = "Failed to scrape match"
+        else:
+            record["data"] = data
+        line = json.dumps(record, ensure_ascii=False)
+        with write_lock:
+            out.write(line + '\n')
+            out.flush()
+        return record["ok"]
+    
+    failed = 0
+    started = time.monotonic()
+    # The scraper logs with print(); keep that off the NDJSON stream
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    pool = ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix='batch')
+    try:
+        futures = [pool.submit(scrape, index, url) for index, url in enumerate(urls)]
+        for future in futures:
+            if not future.result():
+                failed += 1
+    except KeyboardInterrupt:
+        print(f"{Colors.WARNING}Interrupted{Colors.ENDC}")
+        return 130
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        sys.stdout = real_stdout
+        if out is not real_stdout:
+            out.close()
+    
+    print(f"{Colors.GREEN}Scraped {len(urls) - failed}/{len(urls)} matches in {time.monotonic() - started:.1f}s{Colors.ENDC}", file=sys.stderr)
+    return 1 if failed else 0
+
+def run_reparse(argv):
+    """Offline re-parse of every cached page: python app.py reparse-cache
+    
+    Runs the current parser over the page cache and writes one NDJSON record
+    per distinct page, so a parser change can be checked against real pages
+    without touching CREX.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='app.py reparse-cache', description='Re-parse every cached CREX page to NDJSON')
+    parser.add_argument('-d', '--dir', default=page_cache.directory, help=f'cache directory (default: {page_cache.directory or "unset"})')
+    parser.add_argument('-o', '--output', default='-', help='NDJSON output file (default: stdout)')
+    parser.add_argument('--full', action='store_true', help='include the full scorecard')
+    args = parser.parse_args(argv)
+    
+    cache = PageCache(args.dir)
+    entries = cache.entries()
+    if not entries:
+        print(f"{Colors.WARNING}No cached pages in {args.dir or '(page cache disabled)'}{Colors.ENDC}", file=sys.stderr)
+        return 1
+    
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    failed = 0
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        for digest, urls, fetched_at in entries:
+            record = {
+                "digest": digest,
+                "urls": urls,
+                "fetched_at": datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            try:
+                record["data"] = scraper.parse_page(cache.read_object(digest), full=args.full)
+                record["ok"] = True
+            except Exception as e:
+                record["ok"] = False
+                record["error"] = f"{type(e).__name__}: {e}"
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        sys.stdout = real_stdout
+        if out is not real_stdout:
+            out.close()
+    
+    print(f"{Colors.GREEN}Re-parsed {len(entries) - failed}/{len(entries)} cached pages{Colors.ENDC}", file=sys.stderr)
+    return 1 if failed else 0
 
 def get_user_input():
     """Interactive terminal menu"""
-    global CURRENT_MATCH_URL, UPDATE_INTERVAL, MATCH_DATA
+    global UPDATE_INTERVAL
     
     print_banner()
     
@@ -1097,28 +3750,28 @@ def get_user_input():
         url = input(f"\n{Colors.CYAN}Enter CREX match URL: {Colors.ENDC}").strip()
         
         if url:
-            CURRENT_MATCH_URL = url
+            set_current_url(url)
             print(f"\n{Colors.GREEN}✅ URL set successfully!{Colors.ENDC}")
             
             # Initial scrape
             print(f"{Colors.CYAN}📊 Fetching initial scores...{Colors.ENDC}")
-            data = scraper.scrape_crex_scores(url)
+            data = scrape_match_url(url)
             if data:
-                MATCH_DATA = data
+                publish_snapshot(url, data)
                 print_match_update(data)
         else:
                 print(f"{Colors.FAIL}❌ Failed to fetch initial scores{Colors.ENDC}")
     
     elif choice == '2':
         # Use sample URL
-        CURRENT_MATCH_URL = "https://crex.com/scoreboard/WAX/1XP/3rd-Match/1I/16/aus-w-vs-ind-w-3rd-match-australia-women-tour-of-india-2025/live"
+        set_current_url("https://crex.com/scoreboard/WAX/1XP/3rd-Match/1I/16/aus-w-vs-ind-w-3rd-match-australia-women-tour-of-india-2025/live")
         print(f"\n{Colors.GREEN}✅ Using sample URL{Colors.ENDC}")
         
         # Initial scrape
         print(f"{Colors.CYAN}📊 Fetching initial scores...{Colors.ENDC}")
-        data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
+        data = scrape_match_url(CURRENT_MATCH_URL)
         if data:
-            MATCH_DATA = data
+            publish_snapshot(CURRENT_MATCH_URL, data)
             print_match_update(data)
     
     elif choice == '3':
@@ -1128,6 +3781,7 @@ def get_user_input():
         interval = input(f"\n{Colors.CYAN}Enter update interval in seconds (current: {UPDATE_INTERVAL}): {Colors.ENDC}")
         try:
             UPDATE_INTERVAL = int(interval)
+            store.save_setting('update_interval', UPDATE_INTERVAL)
             print(f"{Colors.GREEN}✅ Update interval set to {UPDATE_INTERVAL} seconds{Colors.ENDC}")
         except ValueError:
             print(f"{Colors.FAIL}❌ Invalid interval{Colors.ENDC}")
@@ -1166,27 +3820,52 @@ def print_server_info():
     print("   • Press Ctrl+C to stop the server")
     print(f"{Colors.GREEN}{'='*60}{Colors.ENDC}\n")
 
+# Under a WSGI server (gunicorn app:app) there is no __main__ block, so the
+# worker starts its own background tasks once the module is imported.
+# Parse-pool children import this module too and must not.
+if __name__ != '__main__' and is_production() and multiprocessing.parent_process() is None:
+    start_background_tasks()
+
+COMMANDS = {'batch': run_batch, 'reparse-cache': run_reparse}
+
+if __name__ == '__main__' and sys.argv[1:2] and sys.argv[1] in COMMANDS:
+    sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+
 if __name__ == '__main__':
-    try:
-        # Start background update thread
-        update_thread = threading.Thread(target=auto_update_scores, daemon=True)
-        update_thread.start()
-        
-        # Get user input
-        get_user_input()
+    port = int(os.environ.get('PORT', 5000))
+    host = os.environ.get('HOST', '0.0.0.0')
+    
+    if not is_production():
+        try:
+            # Start background update thread
+            start_background_tasks(warm=False)
+            
+            # Get user input
+            get_user_input()
+            
+            # Run Flask app with proper host configuration
+            app.run(
+                debug=False, 
+                host=host,
+                port=port, 
+                use_reloader=False
+            )
+            
+        except KeyboardInterrupt:
+            print(f"\n\n{Colors.CYAN}Server stopped. Goodbye! 👋{Colors.ENDC}")
+            sys.exit(0)
+    else:
+        # For production on Render or other platforms
+        print(f"{Colors.GREEN}Starting in production mode...{Colors.ENDC}")
         
-        # Run Flask app with proper host configuration
-        port = int(os.environ.get('PORT', 5000))
-        host = os.environ.get('HOST', '0.0.0.0')
+        # Initial scrape runs in the background so the port is bound right away;
+        # /readyz reports when the first snapshot is available.
+        start_background_tasks()
         
+        # Run app without reloader in production
         app.run(
-            debug=False, 
-            host=host,
-            port=port, 
-            use_reloader=False
+            host=host, 
+            port=port,
+            debug=False,
+            use_reloader=False  # Never use reloader in production
         )
-        
-    except KeyboardInterrupt:
-        print(f"\n\n{Colors.CYAN}Server stopped. Goodbye! 👋{Colors.ENDC}")
-        sys.exit(0)
-
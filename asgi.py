@@ -0,0 +1,374 @@
+"""ASGI entry point for serving many long-lived connections
+
+Usage:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    gunicorn asgi:app --worker-class uvicorn_worker.UvicornWorker
+
+Under `gunicorn app:app` every long-poll, push stream or slow client holds a
+worker thread for as long as it is connected. Here the score reads and push
+streams run on one event loop against the shared snapshot, so a waiting
+client costs a coroutine rather than a thread:
+
+    GET /api/current-score    ?since=, ?fields=, ?profile=, ?wait=&version=
+    GET /api/scores           ?ids=, ?fields=, ?profile=, If-None-Match
+    GET /api/stream           Server-Sent Events, one event per new version
+                              (?match=<id>, default the current match)
+    GET /healthz
+
+Every other route, and the first scrape of a match that has no data yet,
+is handed to the Flask app on a thread pool.
+"""
+import asyncio
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import parse_qsl
+
+import app as cricket
+
+FLASK_THREADS = int(os.environ.get('ASGI_FLASK_THREADS', 16))
+STREAM_HEARTBEAT = 15  # seconds between SSE keep-alive comments
+HANDOFF_CHUNKS = 8  # response chunks buffered between a Flask thread and the loop
+
+flask_pool = ThreadPoolExecutor(max_workers=FLASK_THREADS, thread_name_prefix='flask')
+
+
+class VersionWaiters:
+    """The event-loop side of MATCH_WAITERS
+
+    One asyncio.Event per match, replaced on every version bump. Publishes
+    happen on poller threads, so the wake-up is scheduled onto the loop.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.events = {}
+
+    def attach(self, loop):
+        self.loop = loop
+        if self.published not in cricket.PUBLISH_LISTENERS:
+            cricket.PUBLISH_LISTENERS.append(self.published)
+
+    def published(self, match_id, snapshot):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._wake, match_id)
+
+    def _wake(self, match_id):
+        event = self.events.pop(match_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, match_id, known_version, timeout):
+        """True once match_id moves past known_version, False on timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            event = self.events.setdefault(match_id, asyncio.Event())
+            if cricket.SNAPSHOTS.get(match_id, cricket.EMPTY_SNAPSHOT).version != known_version:
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+
+
+waiters = VersionWaiters()
+
+
+def query_args(scope):
+    """First value of each query parameter, like request.args.get()"""
+    args = {}
+    for name, value in parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True):
+        args.setdefault(name, value)
+    return args
+
+
+def header(scope, name):
+    name = name.lower().encode('latin-1')
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def number_arg(args, name, kind, default=None):
+    try:
+        return kind(args[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def respond(send, status, body=b'', headers=None):
+    headers = dict(headers or {}, **{'Content-Length': str(len(body))})
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin-1'), str(v).encode('latin-1')) for k, v in headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def respond_json(send, status, payload, headers=None):
+    headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+    await respond(send, status, cricket.encode_json(payload), headers)
+
+
+def api_headers(scope, extra=None):
+    origin = header(scope, 'origin')
+    headers = dict(cricket.cors_headers(origin)) if origin else {}
+    headers.update(extra or {})
+    return headers
+
+
+async def current_score(scope, receive, send):
+    snapshot = cricket.CURRENT_SNAPSHOT
+    if not cricket.CURRENT_MATCH_URL or not (snapshot and any(snapshot.data.values())):
+        # Flask reports the missing URL or runs the first scrape
+        return await call_flask(scope, receive, send)
+
+    headers = api_headers(scope, {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache, no-store, must-revalidate',
+        'Pragma': 'no-cache',
+        'Expires': '0',
+        'Access-Control-Expose-Headers': 'X-Snapshot-Version',
+    })
+    args = query_args(scope)
+    since = number_arg(args, 'since', int)
+    try:
+        profile, fields = cricket.requested_view(args)
+    except ValueError as e:
+        return await respond_json(send, 400, {"error": str(e)}, headers)
+    if since is not None and profile != 'full':
+        return await respond_json(send, 400, {"error": "?since= deltas are only available for the full profile"}, headers)
+
+    cricket.registry.touch(snapshot.match_id)
+
+    wait_seconds = min(number_arg(args, 'wait', float, 0), cricket.LONG_POLL_MAX)
+    known_version = number_arg(args, 'version', int)
+    if wait_seconds > 0 and known_version is not None:
+        if not await waiters.wait(snapshot.match_id, known_version, wait_seconds):
+            headers['X-Snapshot-Version'] = str(known_version)
+            return await respond(send, 204, b'', headers)
+        snapshot = cricket.SNAPSHOTS.get(snapshot.match_id, snapshot)
+
+    headers['X-Snapshot-Version'] = str(snapshot.version)
+    if since is not None:
+        delta = cricket.project_delta(cricket.snapshot_delta(snapshot, since), fields)
+        return await respond_json(send, 200, delta, headers)
+    await respond(send, 200, snapshot.view(profile, fields), headers)
+
+
+async def scores(scope, receive, send):
+    args = query_args(scope)
+    try:
+        profile, fields = cricket.requested_view(args)
+    except ValueError as e:
+        return await respond_json(send, 400, {"error": str(e)}, api_headers(scope))
+
+    etag, body = cricket.combined_scores(args.get('ids', ''), profile, fields)
+    headers = api_headers(scope, {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache',
+        'ETag': f'"{etag}"',
+    })
+    if etag in (header(scope, 'if-none-match') or ''):
+        return await respond(send, 304, b'', headers)
+    await respond(send, 200, body, headers)
+
+
+async def stream(scope, receive, send):
+    """Server-Sent Events: the match's snapshot now and after every version bump"""
+    args = query_args(scope)
+    match_id = args.get('match', 'current')
+    if match_id == 'current':
+        if not cricket.CURRENT_MATCH_URL:
+            return await respond_json(send, 400, {"error": "No match URL set"}, api_headers(scope))
+        match_id = cricket.match_id_for_url(cricket.CURRENT_MATCH_URL)
+    if match_id not in cricket.SNAPSHOTS:
+        return await respond_json(send, 404, {"error": f"Unknown match: {match_id}"}, api_headers(scope))
+    try:
+        profile, fields = cricket.requested_view(args)
+    except ValueError as e:
+        return await respond_json(send, 400, {"error": str(e)}, api_headers(scope))
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in api_headers(scope, {
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }).items()],
+    })
+
+    async def push():
+        last_version = number_arg({'v': header(scope, 'last-event-id') or ''}, 'v', int)
+        while True:
+            snapshot = cricket.SNAPSHOTS.get(match_id)
+            if snapshot is None:
+                return  # evicted
+            if snapshot.version != last_version:
+                cricket.registry.touch(match_id)
+                last_version = snapshot.version
+                body = snapshot.view(profile, fields)
+                await send({
+                    'type': 'http.response.body',
+                    'body': b'id: %d\nevent: snapshot\ndata: %s\n\n' % (last_version, body),
+                    'more_body': True,
+                })
+            elif not await waiters.wait(match_id, last_version, STREAM_HEARTBEAT):
+                await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(push()), asyncio.ensure_future(disconnected())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+    try:
+        await send({'type': 'http.response.body', 'body': b''})
+    except OSError:
+        pass
+
+
+async def healthz(scope, receive, send):
+    await respond_json(send, 200, {"status": "ok"})
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope, receive, send):
+    """Run the Flask app for this request on the thread pool, streaming its response"""
+    body = []
+    while True:
+        message = await receive()
+        body.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue(maxsize=HANDOFF_CHUNKS)
+    abandoned = threading.Event()
+
+    def hand_off(item):
+        # Blocks the Flask thread while the loop is HANDOFF_CHUNKS behind
+        future = asyncio.run_coroutine_threadsafe(chunks.put(item), loop)
+        while True:
+            try:
+                return future.result(timeout=1)
+            except FutureTimeout:
+                if abandoned.is_set():
+                    future.cancel()
+                    raise ConnectionAbortedError('client went away')
+
+    def run():
+        def start_response(status, headers, exc_info=None):
+            hand_off(('start', int(status.split()[0]), headers))
+
+        try:
+            result = cricket.app(wsgi_environ(scope, b''.join(body)), start_response)
+            try:
+                for chunk in result:
+                    if chunk:
+                        hand_off(('body', chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+            hand_off(('end',))
+        except ConnectionAbortedError:
+            pass
+        except Exception as e:
+            hand_off(('error', e))
+
+    worker = loop.run_in_executor(flask_pool, run)
+    try:
+        while True:
+            item = await chunks.get()
+            if item[0] == 'start':
+                await send({
+                    'type': 'http.response.start',
+                    'status': item[1],
+                    'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in item[2]],
+                })
+            elif item[0] == 'body':
+                await send({'type': 'http.response.body', 'body': item[1], 'more_body': True})
+            elif item[0] == 'error':
+                raise item[1]
+            else:
+                await send({'type': 'http.response.body', 'body': b''})
+                break
+    finally:
+        abandoned.set()
+        await worker
+
+
+ROUTES = {
+    '/api/current-score': current_score,
+    '/api/scores': scores,
+    '/api/stream': stream,
+    '/healthz': healthz,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            waiters.attach(asyncio.get_running_loop())
+            # Idempotent; under PRODUCTION the import of app already did this
+            await asyncio.get_running_loop().run_in_executor(None, cricket.start_background_tasks)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            flask_pool.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get(scope['path']) if scope['method'] == 'GET' else None
+    await (handler or call_flask)(scope, receive, send)
@@ -0,0 +1,188 @@
+"""Offline benchmarks for the scraper
+
+Usage:
+    python bench.py parse [--repeat N]
+    python bench.py pool [--matches 1 10 50] [--processes N] [--rounds N] [--title-only]
+
+Runs against a synthetic page shaped like a CREX live page (large head,
+scripts, navigation and a two-innings scorecard), so no network is needed.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app
+
+
+def sample_title(runs=175, wickets=3, balls=155):
+    overs = f"{balls // 6}.{balls % 6}"
+    return (
+        f"IND U19 {runs}-{wickets} ({overs}) (Abhigyan Kundu 46(55), Vedant Trivedi 53(59)) "
+        f"vs Australia U19 225-9 ((50.0)) Final live | Live Cricket Score | CREX"
+    )
+
+
+def sample_page(title=None, noise_blocks=400, seed=1):
+    """Build a CREX-like page of roughly 100-150 KB"""
+    rng = random.Random(seed)
+    title = title or sample_title()
+
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{title}</title>",
+    ]
+    parts += [f"<meta name='m{i}' content='{'x' * 40}'>" for i in range(40)]
+    parts += [f"<script>var s{i} = {list(range(60))};</script>" for i in range(30)]
+    parts.append("</head><body><app-root>")
+
+    for i in range(noise_blocks):
+        parts.append(
+            f"<div class='card c{i}'><a href='/m/{i}'><span>Match {i}</span></a>"
+            f"<ul>{''.join(f'<li class=item>{rng.randint(0, 300)}</li>' for _ in range(8))}</ul></div>"
+        )
+
+    for innings in range(2):
+        parts.append("<table class='bat'><tr><th>Batter</th><th>R</th><th>B</th><th>4s</th><th>6s</th><th>SR</th></tr>")
+        for b in range(11):
+            parts.append(f"<tr><td>Batter {innings}{b}</td><td>{b * 7}</td><td>{b * 9 + 1}</td><td>2</td><td>1</td><td>77.7</td></tr>")
+        parts.append("</table>")
+        parts.append("<table class='bowl'><tr><th>Bowler</th><th>O</th><th>M</th><th>R</th><th>W</th><th>ECO</th></tr>")
+        for b in range(6):
+            parts.append(f"<tr><td>Bowler {innings}{b}</td><td>{b + 4}.0</td><td>0</td><td>{b * 8 + 20}</td><td>{b % 3}</td><td>5.{b}0</td></tr>")
+        parts.append("</table>")
+        parts.append(
+            "<div class='fow-wrapper'>Fall of wickets "
+            + ", ".join(f"{(w + 1) * 31}-{w + 1} (Batter {innings}{w}, {w * 4 + 3}.{w % 6} ov)" for w in range(3))
+            + "</div>"
+        )
+
+    parts.append(
+        "<div class='recent-balls'>"
+        + "".join(f"<span>{ball}</span>" for ball in ['1', '0', '4', 'W', '0', '2', '1', 'wd', '6', '0', '1', '1'])
+        + "</div>"
+    )
+    parts.append("</app-root></body></html>")
+    return "".join(parts)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"  {label:<40} mean {statistics.mean(samples) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms")
+
+
+def bench_parse(args):
+    from bs4 import BeautifulSoup
+
+    html = sample_page()
+    scraper = app.CricketScraper()
+    print(f"Page size: {len(html) / 1024:.0f} KB, {args.repeat} runs each")
+
+    def baseline_title():
+        # What scrape_crex_scores did before strainers: full DOM, html.parser
+        soup = BeautifulSoup(html, 'html.parser')
+        scraper.parse_title_data(soup.find('title').text.strip())
+
+    cases = [("title, full DOM (html.parser)", baseline_title)]
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        print("  (lxml not installed - skipping lxml cases)")
+
+    for parser in parsers:
+        def run(full, parser=parser):
+            app.HTML_PARSER = parser
+            scraper.parse_page(html, full=full)
+        cases.append((f"title, strained ({parser})", lambda run=run: run(False)))
+        cases.append((f"full scorecard, strained ({parser})", lambda run=run: run(True)))
+
+    # parse_title_data prints debug output on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [(label, timed(fn, args.repeat)) for label, fn in cases]
+    for label, samples in results:
+        report(label, samples)
+
+
+@contextlib.contextmanager
+def silenced():
+    """Drop stdout at the fd level, so spawned parse workers are quiet too"""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def bench_pool(args):
+    """One poll round (parse every tracked match) on threads vs processes"""
+    pages = [sample_page(sample_title(runs=100 + i), seed=i) for i in range(max(args.matches))]
+    scraper = app.CricketScraper()
+    mode = 'full scorecard' if args.full else 'title only'
+    print(f"{args.rounds} rounds each, {app.POLL_WORKERS} poll threads, "
+          f"{args.processes} parse processes, {mode}, {os.cpu_count()} CPUs")
+
+    def poll_round(count):
+        with ThreadPoolExecutor(max_workers=app.POLL_WORKERS) as pool:
+            list(pool.map(lambda html: scraper.parse(html, full=args.full), pages[:count]))
+
+    results = []
+    with silenced():
+        for processes in (0, args.processes):
+            app.PARSE_PROCESSES = processes
+            label = f"{processes} processes" if processes else "threads only"
+            # Untimed round: pays parser imports, and starts the pool's workers
+            poll_round(max(processes, 1))
+            for count in args.matches:
+                results.append((f"{count:>3} matches, {label}", timed(lambda: poll_round(count), args.rounds)))
+        app.reset_parse_pool()
+        app.PARSE_PROCESSES = 0
+
+    for label, samples in results:
+        report(label, samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    parse = sub.add_parser('parse', help='title-only vs full-scorecard parse cost')
+    parse.add_argument('--repeat', type=int, default=30)
+    parse.set_defaults(func=bench_parse)
+
+    pool = sub.add_parser('pool', help='poll-round parse time on threads vs a process pool')
+    pool.add_argument('--matches', type=int, nargs='+', default=[1, 10, 50])
+    pool.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+    pool.add_argument('--rounds', type=int, default=5)
+    pool.add_argument('--title-only', dest='full', action='store_false',
+                      help='parse just the <title> fragment (too cheap to show pool gains)')
+    pool.set_defaults(func=bench_pool)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,632 @@
+"""Load generator and SLO report for the serving endpoints
+
+Usage:
+    python loadtest.py [--configs 1x32 2x16 async] [--viewers 2000] [--duration 60]
+    python loadtest.py --target http://localhost:5000 [--viewers 500] [--admin-token T]
+
+For each gunicorn configuration (WORKERSxTHREADS for gthread workers running
+app.py, or asyncN for N uvicorn workers running asgi.py) this starts a fake CREX
+upstream, boots gunicorn against it and drives it with simulated
+viewers, then prints throughput, latency percentiles, error rate and resident
+memory per worker. With --target it drives an already running instance
+instead (memory is not reported then).
+
+Viewers are a mix of:
+    pollers     GET /api/current-score every --poll-interval (jittered),
+                revalidating with ?since=<version> after the first response
+    long-pollers GET /api/current-score?wait=25&version=<version> in a loop
+    page views  GET / or /live, then /api/scores with If-None-Match
+    streamers   GET /api/stream (Server-Sent Events), async configs only
+
+Push delivery is measured too: --webhooks subscriptions point at a local
+sink, and for both webhooks and streams the report gives events delivered
+and the fan-out spread (first to last arrival of the same version). With
+--target, webhooks need --admin-token and a server started with
+WEBHOOK_ALLOW_PRIVATE=1 so it may post to this machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import secrets
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from bench import sample_page, sample_title
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MATCH_PATH = '/live-cricket-score/ind-vs-aus-final/live'
+REQUEST_TIMEOUT = 60  # long-polls hold for up to 25s
+
+
+class FakeUpstream:
+    """CREX stand-in whose score moves on every few seconds"""
+
+    def __init__(self, run_every=3.0):
+        self.started = time.monotonic()
+        self.run_every = run_every
+        self.pages = {}
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = upstream.page().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}{MATCH_PATH}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page(self):
+        balls = int((time.monotonic() - self.started) / self.run_every)
+        if balls not in self.pages:
+            self.pages = {balls: sample_page(sample_title(runs=100 + balls, balls=100 + balls), seed=balls)}
+        return self.pages[balls]
+
+    def close(self):
+        self.server.shutdown()
+
+
+class PushSink:
+    """Receives webhook batches; one path per subscription (/0, /1, ...)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arrivals = {}  # version -> [monotonic arrival per subscriber]
+        self.batches = 0
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                arrived = time.monotonic()
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.send_response(204)
+                self.end_headers()
+                try:
+                    updates = json.loads(body)['updates']
+                except (ValueError, KeyError, TypeError):
+                    return
+                with sink.lock:
+                    sink.batches += 1
+                    for update in updates:
+                        sink.arrivals.setdefault(update.get('version'), []).append(arrived)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def take(self):
+        """(batches, arrivals) received since the last call"""
+        with self.lock:
+            taken = self.batches, self.arrivals
+            self.batches, self.arrivals = 0, {}
+        return taken
+
+    def close(self):
+        self.server.shutdown()
+
+
+class Stats:
+    """Latencies and outcomes per endpoint label"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.not_modified = 0
+        self.stream_arrivals = {}  # version -> [monotonic arrival per stream]
+
+    def record(self, label, seconds, ok):
+        self.latencies.setdefault(label, []).append(seconds)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def requests(self):
+        return sum(len(samples) for samples in self.latencies.values())
+
+
+class Connection:
+    """A minimal keep-alive HTTP/1.1 client on asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, path, headers=None):
+        """(status, headers, body); reconnects once if a kept-alive socket went stale"""
+        for attempt in (0, 1):
+            fresh = self.writer is None
+            if fresh:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._exchange(path, headers or {})
+            except (ConnectionError, asyncio.IncompleteReadError, EOFError):
+                await self.close()
+                if fresh or attempt:
+                    raise
+
+    async def _exchange(self, path, headers):
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise EOFError('connection closed')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if status in (204, 304) or status < 200:
+            body = b''
+        elif 'content-length' in response_headers:
+            body = await self.reader.readexactly(int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding') == 'chunked':
+            parts = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                parts.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b''.join(parts)
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_headers, body
+
+
+async def timed_get(conn, stats, label, path, headers=None):
+    started = time.perf_counter()
+    try:
+        status, response_headers, body = await asyncio.wait_for(conn.get(path, headers), REQUEST_TIMEOUT)
+    except (OSError, asyncio.TimeoutError, EOFError, asyncio.IncompleteReadError, ValueError):
+        await conn.close()
+        stats.record(label, time.perf_counter() - started, ok=False)
+        return None, {}, b''
+    if status in (204, 304):
+        stats.not_modified += 1
+    stats.record(label, time.perf_counter() - started, ok=status < 400)
+    return status, response_headers, body
+
+
+async def pause(seconds, deadline):
+    """Sleep, but never past the end of the run"""
+    await asyncio.sleep(max(0.0, min(seconds, deadline - time.monotonic())))
+
+
+async def poller(conn, stats, args, deadline):
+    version = None
+    while time.monotonic() < deadline:
+        path = '/api/current-score' if version is None else f'/api/current-score?since={version}'
+        status, headers, _ = await timed_get(conn, stats, 'current-score', path)
+        if status == 200 and headers.get('x-snapshot-version'):
+            version = headers['x-snapshot-version']
+        await pause(args.poll_interval * random.uniform(0.8, 1.2), deadline)
+
+
+async def long_poller(conn, stats, args, deadline):
+    version = None
+    while time.monotonic() < deadline:
+        if version is None:
+            status, headers, _ = await timed_get(conn, stats, 'current-score', '/api/current-score')
+        else:
+            path = f'/api/current-score?wait={args.long_poll_wait}&version={version}'
+            status, headers, _ = await timed_get(conn, stats, 'long-poll', path)
+        if status in (200, 204) and headers.get('x-snapshot-version'):
+            version = headers['x-snapshot-version']
+        if status is None or status >= 400:
+            await pause(args.poll_interval, deadline)
+        elif headers.get('retry-after'):
+            # The server had no free long-poll slot; come back later
+            await pause(float(headers['retry-after']), deadline)
+
+
+async def page_viewer(conn, stats, args, deadline):
+    await timed_get(conn, stats, 'page', random.choice(['/', '/live']))
+    etag = None
+    while time.monotonic() < deadline:
+        headers = {'If-None-Match': etag} if etag else {}
+        status, response_headers, _ = await timed_get(conn, stats, 'scores', '/api/scores', headers)
+        if status == 200:
+            etag = response_headers.get('etag')
+        await pause(args.poll_interval * random.uniform(0.8, 1.2), deadline)
+
+
+async def streamer(conn, stats, args, deadline):
+    """Hold one /api/stream connection open and timestamp every event"""
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(conn.host, conn.port)
+    except OSError:
+        stats.record('stream', time.perf_counter() - started, ok=False)
+        return
+    try:
+        writer.write((f"GET /api/stream HTTP/1.1\r\nHost: {conn.host}:{conn.port}\r\n"
+                      "Accept: text/event-stream\r\n\r\n").encode('latin-1'))
+        status_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        if not status_line or int(status_line.split()[1]) != 200:
+            stats.record('stream', time.perf_counter() - started, ok=False)
+            await pause(args.poll_interval, deadline)
+            return
+
+        # uvicorn frames the open-ended body with chunked encoding
+        buffered = b''
+        first = True
+        while time.monotonic() < deadline:
+            size_line = await asyncio.wait_for(reader.readline(), max(0.1, deadline - time.monotonic()))
+            size = int(size_line.split(b';')[0] or b'0', 16)
+            if size == 0:
+                break
+            buffered += await reader.readexactly(size)
+            await reader.readline()
+            *events, buffered = buffered.split(b'\n\n')
+            for event in events:
+                if not event.startswith(b'id: '):
+                    continue  # keep-alive comment
+                arrived = time.monotonic()
+                if first:
+                    stats.record('stream', time.perf_counter() - started, ok=True)
+                    first = False
+                    continue  # the snapshot sent on connect, not a push
+                version = int(event.split(b'\n', 1)[0][4:])
+                stats.stream_arrivals.setdefault(version, []).append(arrived)
+    except asyncio.TimeoutError:
+        pass  # end of the run
+    except (OSError, EOFError, asyncio.IncompleteReadError, ValueError):
+        stats.record('stream', time.perf_counter() - started, ok=False)
+    finally:
+        writer.close()
+
+
+async def viewer(base, stats, args, deadline, delay, streams):
+    await asyncio.sleep(delay)
+    split = urlsplit(base)
+    conn = Connection(split.hostname, split.port or 80)
+    roll = random.random()
+    if roll < args.long_poll_share:
+        behaviour = long_poller
+    elif roll < args.long_poll_share + args.page_share:
+        behaviour = page_viewer
+    elif streams and roll < args.long_poll_share + args.page_share + args.stream_share:
+        behaviour = streamer
+    else:
+        behaviour = poller
+    try:
+        await behaviour(conn, stats, args, deadline)
+    finally:
+        await conn.close()
+
+
+async def drive(base, args, streams=True):
+    stats = Stats()
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        viewer(base, stats, args, deadline, args.ramp * i / args.viewers, streams)
+        for i in range(args.viewers)
+    ])
+    return stats, time.monotonic() - started
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as handle:
+            return [int(pid) for pid in handle.read().split()]
+    except OSError:
+        return []
+
+
+def rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status') as handle:
+            for line in handle:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class MemorySampler:
+    """Peak RSS of each gunicorn worker, sampled once a second"""
+
+    def __init__(self, master_pid):
+        self.master_pid = master_pid
+        self.peaks = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(1.0):
+            for pid in worker_pids(self.master_pid):
+                self.peaks[pid] = max(self.peaks.get(pid, 0), rss_bytes(pid))
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        return sorted(self.peaks.values())
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(base, timeout=60):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{base}/readyz', timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def subscribe_webhooks(base, sink, args, match_id=None):
+    """Register --webhooks subscriptions pointing at the sink; returns how many took"""
+    import requests
+
+    headers = {'Authorization': f'Bearer {args.admin_token}'} if args.admin_token else {}
+    subscribed = 0
+    for index in range(args.webhooks):
+        payload = {'url': f'{sink.url}/{index}'}
+        if match_id:
+            payload['match_id'] = match_id
+        response = requests.post(f'{base}/api/webhooks', json=payload, headers=headers, timeout=10)
+        if response.status_code != 201:
+            print(f"  webhook subscription refused: HTTP {response.status_code} {response.text.strip()}")
+            break
+        subscribed += 1
+    return subscribed
+
+
+def fan_out(arrivals, receivers=None):
+    """Delivery summary for one push channel from {version: [arrival times]}"""
+    spreads = sorted(max(times) - min(times) for times in arrivals.values() if len(times) > 1)
+    summary = {
+        'versions': len(arrivals),
+        'deliveries': sum(len(times) for times in arrivals.values()),
+        'spread_p50_ms': round(percentile(spreads, 50) * 1000, 1),
+        'spread_p99_ms': round(percentile(spreads, 99) * 1000, 1),
+    }
+    if receivers is not None:
+        summary['subscribers'] = receivers
+        summary['incomplete_versions'] = sum(1 for times in arrivals.values() if len(times) < receivers)
+    return summary
+
+
+def start_gunicorn(workers, threads, upstream_url, args):
+    """threads=None runs the ASGI entry point on uvicorn workers instead of gthread"""
+    port = free_port()
+    state_dir = tempfile.mkdtemp(prefix='loadtest-')
+    env = dict(
+        os.environ,
+        PRODUCTION='true',
+        DEFAULT_MATCH_URL=upstream_url,
+        UPDATE_INTERVAL=str(args.update_interval),
+        SNAPSHOT_DB=os.path.join(state_dir, 'state.db'),
+        PAGE_CACHE_DIR='',
+        ADMIN_TOKEN=args.admin_token,
+        WEBHOOK_ALLOW_PRIVATE='1',  # the sink is on this machine
+    )
+    if threads is None:
+        command = [sys.executable, '-m', 'gunicorn', 'asgi:app', '--worker-class', 'uvicorn_worker.UvicornWorker']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', 'app:app', '--worker-class', 'gthread', '--threads', str(threads)]
+        # Leave most threads free for ordinary requests while long-polls park
+        env['LONG_POLL_SLOTS'] = str(max(1, threads // 4))
+    command += [
+        '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}',
+        '--keep-alive', str(args.keep_alive),
+        '--log-level', 'warning',
+    ]
+    output = None if args.verbose else subprocess.DEVNULL
+    process = subprocess.Popen(command, cwd=HERE, env=env, stdout=output, stderr=output)
+    return process, f'http://127.0.0.1:{port}'
+
+
+def summarize(label, stats, elapsed, memory, args, push=None):
+    all_samples = sorted(s for samples in stats.latencies.values() for s in samples)
+    total = len(all_samples)
+    errors = sum(stats.errors.values())
+    # Long-polls are meant to be slow; keep them out of the latency SLO
+    served = sorted(s for name, samples in stats.latencies.items() if name != 'long-poll' for s in samples)
+    p99 = percentile(served, 99) * 1000
+    error_rate = errors / total * 100 if total else 100.0
+    result = {
+        'config': label,
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1) if elapsed else 0,
+        'not_modified': stats.not_modified,
+        'error_rate_pct': round(error_rate, 3),
+        'p50_ms': round(percentile(served, 50) * 1000, 1),
+        'p95_ms': round(percentile(served, 95) * 1000, 1),
+        'p99_ms': round(p99, 1),
+        'endpoints': {},
+        'worker_rss_mb': [round(b / 1024 / 1024, 1) for b in memory],
+        'slo_met': p99 <= args.slo_p99 and error_rate <= args.slo_errors,
+        'push': push or {},
+    }
+    for name, samples in sorted(stats.latencies.items()):
+        ordered = sorted(samples)
+        result['endpoints'][name] = {
+            'requests': len(ordered),
+            'errors': stats.errors.get(name, 0),
+            'p50_ms': round(percentile(ordered, 50) * 1000, 1),
+            'p95_ms': round(percentile(ordered, 95) * 1000, 1),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 1),
+        }
+    return result
+
+
+def print_report(results, args):
+    print(f"\nSLO: p99 <= {args.slo_p99:.0f} ms (long-polls excluded), errors <= {args.slo_errors}%")
+    print(f"{args.viewers} viewers for {args.duration}s each\n")
+    print(f"  {'config':<10} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>8} {'RSS/worker':>12}  SLO")
+    for result in results:
+        rss = result['worker_rss_mb']
+        rss_text = f"{max(rss):.0f} MB" if rss else 'n/a'
+        print(f"  {result['config']:<10} {result['throughput_rps']:>8.1f} {result['p50_ms']:>6.1f}ms "
+              f"{result['p95_ms']:>6.1f}ms {result['p99_ms']:>6.1f}ms {result['error_rate_pct']:>7.2f}% "
+              f"{rss_text:>12}  {'PASS' if result['slo_met'] else 'FAIL'}")
+        for name, endpoint in result['endpoints'].items():
+            print(f"      {name:<14} {endpoint['requests']:>7} req  p50 {endpoint['p50_ms']:>7.1f}  "
+                  f"p95 {endpoint['p95_ms']:>7.1f}  p99 {endpoint['p99_ms']:>7.1f} ms  errors {endpoint['errors']}")
+        for channel, push in result['push'].items():
+            extra = ''
+            if 'subscribers' in push:
+                extra = f"  {push['subscribers']} subscribers, {push['incomplete_versions']} versions not delivered to all"
+            print(f"      push {channel:<9} {push['deliveries']:>7} events for {push['versions']} versions  "
+                  f"spread p50 {push['spread_p50_ms']:>7.1f}  p99 {push['spread_p99_ms']:>7.1f} ms{extra}")
+
+
+def raise_fd_limit(viewers):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, viewers * 2 + 256))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+def drive_with_push(base, sink, args, streams, match_id=None):
+    """Run the viewers, with webhooks registered first; returns (stats, elapsed, push)"""
+    subscribers = subscribe_webhooks(base, sink, args, match_id) if args.webhooks else 0
+    sink.take()
+    stats, elapsed = asyncio.run(drive(base, args, streams))
+    # Let the last batching window flush
+    time.sleep(1.0 if subscribers else 0)
+    batches, arrivals = sink.take()
+    push = {}
+    if streams and args.stream_share:
+        push['stream'] = fan_out(stats.stream_arrivals)
+    if subscribers:
+        push['webhook'] = dict(fan_out(arrivals, subscribers), batches=batches)
+    return stats, elapsed, push
+
+
+def run_config(spec, upstream, sink, args):
+    if spec.lower().startswith('async'):
+        workers, threads = int(spec[5:] or 1), None
+        print(f"[{spec}] starting gunicorn: {workers} uvicorn (asgi.py) workers")
+    else:
+        workers, threads = (int(n) for n in spec.lower().split('x'))
+        print(f"[{spec}] starting gunicorn: {workers} workers x {threads} threads")
+    process, base = start_gunicorn(workers, threads, upstream.url, args)
+    try:
+        if not wait_ready(base):
+            print(f"[{spec}] server did not become ready; skipping")
+            return None
+        sampler = MemorySampler(process.pid)
+        # /api/stream is only served by the ASGI entry point
+        match_id = MATCH_PATH.rstrip('/').split('/')[-2]
+        stats, elapsed, push = drive_with_push(base, sink, args, threads is None, match_id)
+        memory = sampler.stop()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return summarize(spec, stats, elapsed, memory, args, push)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', default=['1x32', '2x16', 'async'],
+                        help='gunicorn WORKERSxTHREADS (gthread) or asyncN (uvicorn) configs to compare')
+    parser.add_argument('--target', help='drive an already running instance instead of starting gunicorn')
+    parser.add_argument('--viewers', type=int, default=2000)
+    parser.add_argument('--duration', type=float, default=60, help='seconds of load per configuration')
+    parser.add_argument('--ramp', type=float, default=10, help='seconds over which viewers arrive')
+    parser.add_argument('--poll-interval', type=float, default=5, help='seconds between a viewer\'s polls')
+    parser.add_argument('--long-poll-share', type=float, default=0.2)
+    parser.add_argument('--long-poll-wait', type=float, default=25)
+    parser.add_argument('--page-share', type=float, default=0.1)
+    parser.add_argument('--stream-share', type=float, default=0.1, help='share of viewers on /api/stream (async configs)')
+    parser.add_argument('--webhooks', type=int, default=20, help='webhook subscriptions to register (0 to skip)')
+    parser.add_argument('--admin-token', default=os.environ.get('ADMIN_TOKEN') or secrets.token_hex(16),
+                        help='admin token for the webhook API (generated for the servers started here)')
+    parser.add_argument('--update-interval', type=int, default=5, help='the server\'s scrape interval')
+    parser.add_argument('--keep-alive', type=int, default=10, help='gunicorn --keep-alive seconds')
+    parser.add_argument('--slo-p99', type=float, default=250, help='p99 latency target in ms')
+    parser.add_argument('--slo-errors', type=float, default=0.1, help='error-rate target in percent')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--verbose', action='store_true', help='show gunicorn output')
+    args = parser.parse_args(argv)
+
+    raise_fd_limit(args.viewers)
+    results = []
+    sink = PushSink()
+    try:
+        if args.target:
+            stats, elapsed, push = drive_with_push(args.target.rstrip('/'), sink, args, streams=True)
+            results.append(summarize('target', stats, elapsed, [], args, push))
+        else:
+            upstream = FakeUpstream()
+            try:
+                for spec in args.configs:
+                    result = run_config(spec, upstream, sink, args)
+                    if result:
+                        results.append(result)
+            finally:
+                upstream.close()
+    finally:
+        sink.close()
+
+    print_report(results, args)
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(results, handle, indent=2)
+    return 0 if results and all(result['slo_met'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())